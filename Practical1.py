@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_csv
 
 # 1. Reading data from different formats: CSV and Excel
-df_csv = pd.read_csv('E:\\DSML Practical\\venv\\Datasets\\Titanic.csv')
+df_csv = load_csv('E:\\DSML Practical\\venv\\Datasets\\Titanic.csv')
 
 # Print first 5 rows of csv
 print("\n=== First 5 rows of CSV ===")
@@ -1,4 +1,4 @@
-import math
+from kmeans_engine import assign_step, cluster_means, cluster_members, kmeans_steps, named_points
 
 points = {
     "P1": (2, 10),
@@ -10,25 +10,19 @@ points = {
     "P7": (1, 2),
     "P8": (4, 9),
 }
+METRIC = "euclidean"   # also "manhattan" or "cosine"
+FULL_RUN = False       # True: after the questions, iterate assign/update until the clusters stop changing
 
-# Initial centroids
-m1 = points["P1"]
-m2 = points["P4"]
-m3 = points["P7"]
-
-def euclidean(a, b):
-    return math.sqrt((a[0]-b[0])**2 + (a[1]-b[1])**2)
+# Points as one array (any dimension) plus a name -> row index
+names, index, X = named_points(points)
 
-assignments = {}
-distances = {}
+# Initial centroids
+centroids = X[[index["P1"], index["P4"], index["P7"]]]
 
-for name, coord in points.items():
-    d1 = euclidean(coord, m1)
-    d2 = euclidean(coord, m2)
-    d3 = euclidean(coord, m3)
-    distances[name] = (d1, d2, d3)
-    nearest = min((d1, 1), (d2, 2), (d3, 3))[1]
-    assignments[name] = nearest
+# One vectorized assignment step: distances to every centroid, nearest wins (ties -> lower cluster)
+labels, dist = assign_step(X, centroids, METRIC, return_distances=True)
+assignments = {name: int(c) + 1 for name, c in zip(names, labels)}
+distances = {name: tuple(d) for name, d in zip(names, dist)}
 
 # print assignments 
 for name in sorted(points.keys(), key=lambda x: int(x[1:])):
@@ -40,23 +34,13 @@ print("\n1) Which cluster does P6 belong to?")
 print(f"   P6 belongs to Cluster {assignments['P6']}")
 
 # 2) Population of the cluster around m3 (Cluster 3)
-cluster3_points = [name for name, c in assignments.items() if c == 3]
+cluster1_points, cluster2_points, cluster3_points = cluster_members(names, labels, len(centroids))
 print("\n2) Population of cluster around m3 (Cluster 3):")
 print(f"   Points in Cluster 3: {cluster3_points}")
 print(f"   Population (size) = {len(cluster3_points)}")
 
-# 3) Updated centroids (mean of points in each cluster)
-def mean_of_points(names_list):
-    xs = [points[n][0] for n in names_list]
-    ys = [points[n][1] for n in names_list]
-    return (sum(xs) / len(xs), sum(ys) / len(ys))
-
-cluster1_points = [name for name, c in assignments.items() if c == 1]
-cluster2_points = [name for name, c in assignments.items() if c == 2]
-
-m1_updated = mean_of_points(cluster1_points)
-m2_updated = mean_of_points(cluster2_points)
-m3_updated = mean_of_points(cluster3_points)
+# 3) Updated centroids (mean of points in each cluster, one pass for all clusters)
+(m1_updated, m2_updated, m3_updated), _ = cluster_means(X, labels, len(centroids))
 
 print("\n3) Updated centroids after one assignment step:")
 print(f"   Cluster 1 points: {cluster1_points}")
@@ -66,4 +50,13 @@ print(f"   Cluster 2 points: {cluster2_points}")
 print(f"   Updated m2 = ({m2_updated[0]:.6f}, {m2_updated[1]:.6f})")
 
 print(f"   Cluster 3 points: {cluster3_points}")
-print(f"   Updated m3 = ({m3_updated[0]:.6f}, {m3_updated[1]:.6f})")
\ No newline at end of file
+print(f"   Updated m3 = ({m3_updated[0]:.6f}, {m3_updated[1]:.6f})")
+
+# Optional: the full k-means run from the same initial centroids, step by step
+if FULL_RUN:
+    print("\nFull run until the clusters stop changing:")
+    for it, step_labels, step_centroids in kmeans_steps(X, centroids, METRIC):
+        members = cluster_members(names, step_labels, len(step_centroids))
+        for c, (m, pts) in enumerate(zip(step_centroids, members), start=1):
+            coords = ", ".join(f"{v:.6f}" for v in m)
+            print(f"  step {it}: m{c} = ({coords}) <- {pts}")
@@ -1,8 +1,9 @@
 # DESCRIBE THE DATASET
-import pandas as pd
+from covid_stats import FIRST_DOSE, SECOND_DOSE, ranked, update_store
+from dataset_cache import load_csv
 
 # Load dataset
-df = pd.read_csv('venv\Datasets\Covid Vaccine Statewise.csv')
+df = load_csv('venv\Datasets\Covid Vaccine Statewise.csv')
 
 # Show first few rows
 print("Dataset Preview:\n")
@@ -16,12 +17,17 @@ print(df.info())
 print("\nStatistical Summary:")
 print(df.describe())
 
+# State-wise maxima from the aggregate store (.covid_store.json): only rows
+# appended to the CSV since the last run are read
+store = update_store(['venv\Datasets\Covid Vaccine Statewise.csv'])
+maxima = store.maxima([FIRST_DOSE, SECOND_DOSE])
+
 # 2. NUMBER OF PERSONS STATE_WISE VACCINATED FOR FIRST DOSE
-first_dose = df.groupby("State")["First Dose Administered"].max().sort_values(ascending=False)
+first_dose = ranked(maxima, FIRST_DOSE)
 print("\nState-wise First Dose Vaccination:\n")
 print(first_dose)
 
 # 3. NUMBER OF PERSONS STATE_WISE VACCINATED FOR SECOND DOSE
-second_dose = df.groupby("State")["Second Dose Administered"].max().sort_values(ascending=False)
+second_dose = ranked(maxima, SECOND_DOSE)
 print("\nState-wise Second dose vaccination:\n")
 print(second_dose)
\ No newline at end of file
@@ -1,7 +1,8 @@
-import pandas as pd
+from covid_stats import FEMALE, MALE, ranked, update_store
+from dataset_cache import load_csv
 
 # Load dataset
-df = pd.read_csv(r'venv\Datasets\Covid Vaccine Statewise.csv')
+df = load_csv(r'venv\Datasets\Covid Vaccine Statewise.csv')
 
 # Show available columns (important)
 print("Columns in dataset:\n")
@@ -26,15 +27,20 @@ print(df.describe())
 # "Female(Individuals Vaccinated)"
 
 # Replace these with the exact names from your dataset
-male_col = "Male(Individuals Vaccinated)"
-female_col = "Female(Individuals Vaccinated)"
+male_col = MALE
+female_col = FEMALE
+
+# State-wise maxima from the aggregate store (.covid_store.json): only rows
+# appended to the CSV since the last run are read
+store = update_store([r'venv\Datasets\Covid Vaccine Statewise.csv'])
+maxima = store.maxima([male_col, female_col])
 
 # 2. Number of Males Vaccinated
-male_vaccinated = df.groupby("State")[male_col].max().sort_values(ascending=False)
+male_vaccinated = ranked(maxima, male_col)
 print("\nState-wise Males Vaccinated:\n")
 print(male_vaccinated)
 
 # 3. Number of Females Vaccinated
-female_vaccinated = df.groupby("State")[female_col].max().sort_values(ascending=False)
+female_vaccinated = ranked(maxima, female_col)
 print("\nState-wise Females Vaccinated:\n")
 print(female_vaccinated)
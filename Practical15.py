@@ -1,9 +1,9 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from dataset_cache import load_csv
 
 # Load your dataset
-df = pd.read_csv('venv\Datasets\Titanic.csv')
+df = load_csv('venv\Datasets\Titanic.csv')
 
 # Show first few rows
 print("Dataset Preview:\n")
@@ -1,7 +1,7 @@
-import pandas as pd
+from dataset_cache import load_csv
 
 # Load your Dataset
-df = pd.read_csv('venv\Datasets\House Data.csv')
+df = load_csv('venv\Datasets\House Data.csv')
 
 # Show columns to identify categorical and numeric variables
 print("Dataset Columns:\n")
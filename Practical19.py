@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+from dataset_cache import load_csv
 
 # --- Adjust the CSV path to your actual file ---
 csv_path = r'venv\Datasets\IRIS.csv'   # <-- change if needed
@@ -8,7 +9,7 @@ if not os.path.exists(csv_path):
     raise FileNotFoundError(f"CSV file not found at: {csv_path}")
 
 # Load the data
-df = pd.read_csv(csv_path)
+df = load_csv(csv_path)
 
 # Normalize column name for species if necessary (case-insensitive)
 species_col = None
@@ -1,54 +1,70 @@
 import pandas as pd
 
+from dataset_cache import load_csv
+from summary_stats import summarize, summarize_csv
+
+CSV_FILE = "venv\Datasets\Telecom Churn.csv"
+STREAM_CHUNK_ROWS = None   # e.g. 1_000_000: stream the CSV in chunks with constant memory
+                           # (percentiles then come from a KLL sketch, see summary_stats.py)
+
 #----------------------------------------------
 # 1. Load the Dataset
 #----------------------------------------------
-df = pd.read_csv("venv\Datasets\Telecom Churn.csv")
+if STREAM_CHUNK_ROWS is None:
+    df = load_csv(CSV_FILE)
+    head, columns = df.head(), df.columns
+    # Every statistic below comes from one pass over each column
+    # (min/max/mean/variance in chunks, all three percentiles from one partition)
+    stats = summarize(df, percentiles=(0.25, 0.50, 0.75))
+else:
+    state = summarize_csv(CSV_FILE, chunk_rows=STREAM_CHUNK_ROWS)
+    head, columns = state.head, pd.Index(state.columns)
+    stats = state.result(percentiles=(0.25, 0.50, 0.75))
 
 print("\n=== First 5 rows of Dataset ===")
-print(df.head())
+print(head)
 
 print("\n=== Columns in dataset ===")
-print(df.columns)
+print(columns)
 
 # ----------------------------------------------
 # 2. Mininmum value of each feature
 # ----------------------------------------------
 print("\n=== Mininmum value of each feature ===")
-print(df.min())
+print(stats["min"])
 
 #----------------------------------------------
 # 3. Maximum value of each feature
 #----------------------------------------------
 print("\n=== Maximum value of each feature ===")
-print(df.max())
+print(stats["max"])
 
 #----------------------------------------------
 # 4. Mean value of each feature
 #----------------------------------------------
 print("\n=== Mean of each column ===")
-print(df.mean(numeric_only=True))
+print(stats["mean"])
 
 #----------------------------------------------
 # 5. Std deviation of each feature
 #----------------------------------------------
 print("\n=== Std deviation of each column ===")
-print(df.std(numeric_only=True))
+print(stats["std"])
 
 #----------------------------------------------
 # 6. Variance of each feature
 #----------------------------------------------
 print("\n=== Variance of each column ===")
-print(df.var(numeric_only=True))
+print(stats["var"])
 
 #----------------------------------------------
 # 7. Percentiles (25th, 50th, 75th)
 #----------------------------------------------
 print("\n=== 25th Percentile ===")
-print(df.select_dtypes(include="number").quantile(0.25))
+print(stats[0.25])
 
 print("\n=== 50th Percentile (Median) ===")
-print(df.select_dtypes(include="number").quantile(0.50))
+print(stats[0.50])
 
 print("\n=== 75th Percentile ===")
-print(df.select_dtypes(include="number").quantile(0.75))
\ No newline at end of file
+print(stats[0.75])
\ No newline at end of file
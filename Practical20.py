@@ -3,79 +3,159 @@ import random
 import numpy as np
 import pandas as pd
 
+from dataset_cache import load_csv
+from kmeans_engine import (csv_chunks, init_centroids, k_sweep, kmeans_hamerly, kmeans_restarts,
+                           kmeans_threaded, minibatch_kmeans, npy_chunks, write_labels)
+
 k = 3
-ITERATIONS = 10
+ITERATIONS = 10              # maximum iterations (the accelerated mode may stop earlier)
+ACCELERATED = False          # True: Hamerly bounds + convergence stopping (else a fixed ITERATIONS loop)
+TOL = 1e-4                   # stop when no centroid moves more than this ...
+LABEL_TOL = 0                # ... and at most this many labels changed
 RANDOM_SEED = 42
+DTYPE = np.float64           # np.float32 halves memory and uses single-precision BLAS
+MEMORY_BUDGET = 64 * 2**20   # bytes per assignment chunk
+BACKEND = "auto"             # assignment: "brute", "kdtree" or "auto" (kd-tree for small d, large k)
+INIT = "random"              # seeding: "random" (k distinct data points), "k-means++" or "k-means||"
+N_INIT = 1                   # >1: independent restarts, the lowest-inertia run is kept; each run
+                             # honours ACCELERATED, TOL, LABEL_TOL, BACKEND and THREADS
+WORKERS = None               # processes for the restarts / k-sweep silhouettes (None / 1 = in-process)
+THREADS = None               # threads for the plain (not ACCELERATED) assign/update loop
+SWEEP_K = None               # e.g. range(1, 11): print a k-selection report instead of clustering once
+SILHOUETTE_SAMPLE = 2000     # stratified sample size for the k-sweep silhouette estimate
+STREAM_PATH = None           # set to a large CSV / 2-D .npy to cluster it out-of-core (mini-batch)
+STREAM_CHUNK_ROWS = 100000   # rows read from STREAM_PATH at a time
+STREAM_BATCH_SIZE = 4096     # rows per mini-batch update
+STREAM_EPOCHS = 1            # passes over STREAM_PATH
+LABELS_OUT = None            # optional file for a final full-pass labeling (one label per row)
 csv_paths_to_try = ["IRIS.csv", "iris.csv", r'venv\Datasets\IRIS.csv', r'venv/Datasets/IRIS.csv']
 
-np.random.seed(RANDOM_SEED)
-random.seed(RANDOM_SEED)
-
-# LOAD THE DATASET
-df = None
-for p in csv_paths_to_try:
-    if os.path.exists(p):
-        df = pd.read_csv(p)
-        print(f"Loaded dataset from: {p}")
-        break
-
-if df is None:
-    # fallback
-    try:
-        import seaborn as sns
-        df = sns.load_dataset("iris")
-        print("Loaded inbuilt seaborn 'iris' dataset (fallback)")
-    except Exception as e:
-        raise FileNotFoundError("Could not find IRIS.csv in tried paths and seaborn load failed")
-    
-# PREPARE FEATURE MATRIX
-numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-
-if len(numeric_cols) < 1:
-    raise ValueError("No numeric columns found in dataset. Check your csv")
-
-# Typical iris features are the first 4 numeric columns
-feature_cols = numeric_cols[:4] if len(numeric_cols) >= 4 else numeric_cols
-X = df[feature_cols].copy().to_numpy(dtype=float)
-
-print("\nUsing feature columns for clustering:", feature_cols)
-print("Data shape:", X.shape)
-
-# K-MEANS IMPLEMENTATION
-n_samples, n_features = X.shape
-
-# Initialize centroids by randomly choosing k distinct points from X
-initial_idx = np.random.choice(n_samples, size=k, replace=False)
-centroids = X[initial_idx].astype(float)
-print("\nInitial centroids (chosen from random data points)")
-for i, c in enumerate(centroids):
-    print(f"Centroid {i}: {c}")
-
-# iterate assign -> update
-for it in range(1, ITERATIONS + 1):
-    distances = np.linalg.norm(X[:, np.newaxis, :] - centroids[np.newaxis, :, :], axis=2)
-
-    # Assign labels: nearest centroid
-    labels = np.argmin(distances, axis=1)
-
-    # Update centroid
-    new_centroids = np.zeros_like(centroids)
-    for k in range(k):
-        members = X[labels == k]
-        if len(members) == 0:
-            reinit_idx = np.random.choice(n_samples, 1)[0]
-            new_centroids[k] = X[reinit_idx]
-            print(f"Interation {it}: Cluster {k} had no members - reinitialized to data point index")
+def pick_features(numeric_cols):
+    if len(numeric_cols) < 1:
+        raise ValueError("No numeric columns found in dataset. Check your csv")
+    # Typical iris features are the first 4 numeric columns
+    return numeric_cols[:4] if len(numeric_cols) >= 4 else numeric_cols
+
+def report_empty(it, cluster):
+    print(f"Interation {it}: Cluster {cluster} had no members - reinitialized to data point index")
+
+def main():
+    np.random.seed(RANDOM_SEED)
+    random.seed(RANDOM_SEED)
+
+    # OUT-OF-CORE MODE: mini-batch k-means streamed from STREAM_PATH in chunks (k-means++ seeding on the first batch)
+    if STREAM_PATH is not None:
+        # same feature columns as the in-memory mode, picked from the first chunk / the array shape
+        if STREAM_PATH.endswith(".npy"):
+            feature_cols = pick_features(list(range(np.load(STREAM_PATH, mmap_mode="r").shape[1])))
+            source = npy_chunks(STREAM_PATH, columns=feature_cols, chunk_rows=STREAM_CHUNK_ROWS, dtype=DTYPE)
         else:
-            new_centroids[k] = members.mean(axis=0)
-
-    centroids = new_centroids
-
-# FINAL RESULTS
-print("\n Final cluster means after", ITERATIONS, "iterations:")
-for i, c in enumerate(centroids):
-    formatted = ", ".join(f"{val:.4f}" for val in c)
-    print(f"Cluster {i} mean: [{formatted}]")
-
-
-    
+            head = pd.read_csv(STREAM_PATH, nrows=STREAM_CHUNK_ROWS)
+            feature_cols = pick_features(head.select_dtypes(include=[np.number]).columns.tolist())
+            source = csv_chunks(STREAM_PATH, columns=feature_cols, chunk_rows=STREAM_CHUNK_ROWS, dtype=DTYPE)
+        print(f"Streaming {STREAM_PATH} in chunks of {STREAM_CHUNK_ROWS} rows, feature columns: {feature_cols}")
+        centroids, seen, n_batches = minibatch_kmeans(source, k, batch_size=STREAM_BATCH_SIZE,
+                                                      n_epochs=STREAM_EPOCHS, dtype=DTYPE)
+        print(f"\nMini-batch k-means: {n_batches} batches, {int(seen.sum())} points absorbed")
+        for i, c in enumerate(centroids):
+            formatted = ", ".join(f"{val:.4f}" for val in c)
+            print(f"Cluster {i} mean: [{formatted}] (points seen: {int(seen[i])})")
+        if LABELS_OUT is not None:
+            n_rows = write_labels(source, centroids, LABELS_OUT, dtype=DTYPE)
+            print(f"Wrote {n_rows} labels to {LABELS_OUT}")
+        return
+
+    # LOAD THE DATASET
+    df = None
+    for p in csv_paths_to_try:
+        if os.path.exists(p):
+            df = load_csv(p)
+            print(f"Loaded dataset from: {p}")
+            break
+
+    if df is None:
+        # fallback
+        try:
+            import seaborn as sns
+            df = sns.load_dataset("iris")
+            print("Loaded inbuilt seaborn 'iris' dataset (fallback)")
+        except Exception as e:
+            raise FileNotFoundError("Could not find IRIS.csv in tried paths and seaborn load failed")
+
+    # PREPARE FEATURE MATRIX
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    feature_cols = pick_features(numeric_cols)
+    X = df[feature_cols].copy().to_numpy(dtype=float)
+
+    print("\nUsing feature columns for clustering:", feature_cols)
+    print("Data shape:", X.shape)
+
+    # K SELECTION: inertia (elbow) and sampled silhouette for every k in SWEEP_K
+    if SWEEP_K is not None:
+        report = k_sweep(X.astype(DTYPE, copy=False), SWEEP_K, sample_size=SILHOUETTE_SAMPLE,
+                         seed=RANDOM_SEED, max_iter=ITERATIONS, tol=TOL, workers=WORKERS, dtype=DTYPE)
+        print(f"\n{'k':>3} {'inertia':>14} {'silhouette':>11} {'iterations':>11} {'time (s)':>9}")
+        for r in report:
+            sil = f"{r['silhouette']:.4f}" if r["silhouette"] is not None else "-"
+            print(f"{r['k']:>3} {r['inertia']:>14.4f} {sil:>11} {r['n_iter']:>11} "
+                  f"{r['fit_s'] + r['silhouette_s']:>9.3f}")
+        scored = [r for r in report if r["silhouette"] is not None]
+        if scored:
+            print("Highest silhouette at k =", max(scored, key=lambda r: r["silhouette"])["k"])
+        return
+
+    # K-MEANS IMPLEMENTATION
+    n_samples, n_features = X.shape
+
+    # Initialize centroids: "random" picks k distinct points from X, "k-means++" / "k-means||"
+    # spread them out by sampling proportional to squared distance from the centers chosen so far
+    if N_INIT <= 1:
+        centroids = init_centroids(X, k, INIT, dtype=DTYPE)
+        print("\nInitial centroids (chosen from random data points)" if INIT == "random" else
+              f"\nInitial centroids ({INIT} seeding)")
+        for i, c in enumerate(centroids):
+            print(f"Centroid {i}: {c}")
+
+    if N_INIT > 1:
+        # independent seeded restarts (in a process pool sharing X when WORKERS > 1); lowest inertia wins
+        result = kmeans_restarts(X, k, n_init=N_INIT, init=INIT, max_iter=ITERATIONS, tol=TOL,
+                                 seed=RANDOM_SEED, workers=WORKERS, dtype=DTYPE, label_tol=LABEL_TOL,
+                                 backend=BACKEND, on_empty=report_empty, accelerated=ACCELERATED,
+                                 n_threads=THREADS or 1)
+        centroids = result["centroids"]
+        n_iter = result["n_iter"]
+        print(f"\n{N_INIT} restarts with {INIT} seeding:")
+        for run in result["runs"]:
+            print(f"  seed {run['seed']}: inertia = {run['inertia']:.4f}, {run['n_iter']} iterations, "
+                  f"init {run['init_s'] * 1000:.1f} ms, fit {run['fit_s'] * 1000:.1f} ms")
+        print(f"Best run: seed {result['seed']}, inertia = {result['inertia']:.4f}")
+    elif ACCELERATED:
+        # Hamerly bounds skip distance evaluations that can't change a label; stops on convergence
+        result = kmeans_hamerly(X, centroids, max_iter=ITERATIONS, tol=TOL, label_tol=LABEL_TOL,
+                                dtype=DTYPE, on_empty=report_empty, backend=BACKEND)
+        centroids = result["centroids"]
+        n_iter = result["n_iter"]
+        total_evals = result["distance_evals"] + result["distance_evals_skipped"]
+        print(f"\nAccelerated k-means: {n_iter} iterations, converged = {result['converged']}, "
+              f"inertia = {result['inertia']:.4f}")
+        print(f"Distance computations: {result['distance_evals']} done, "
+              f"{result['distance_evals_skipped']} skipped ({result['distance_evals_skipped'] / total_evals:.1%})")
+    else:
+        # plain assign -> update for exactly ITERATIONS iterations. Assign labels: nearest centroid
+        # (chunked ||x||^2 - 2x.c + ||c||^2, no n x k x d temporary); update centroids: per-shard
+        # bincount sums/counts reduced into the cluster means, empty clusters re-seeded at a random
+        # point. With THREADS > 1 each step is split into row shards assigned on a thread pool.
+        result = kmeans_threaded(X, centroids, max_iter=ITERATIONS, tol=None, n_threads=THREADS or 1,
+                                 dtype=DTYPE, on_empty=report_empty, backend=BACKEND,
+                                 memory_budget=MEMORY_BUDGET)
+        centroids = result["centroids"]
+        n_iter = result["n_iter"]
+
+    # FINAL RESULTS
+    print("\n Final cluster means after", n_iter, "iterations:")
+    for i, c in enumerate(centroids):
+        formatted = ", ".join(f"{val:.4f}" for val in c)
+        print(f"Cluster {i} mean: [{formatted}]")
+
+if __name__ == "__main__":
+    main()
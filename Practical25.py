@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
+from dataset_cache import load_csv
 
 # Load dataset
-df = pd.read_csv("venv\Datasets\Lung Cancer.csv")
+df = load_csv("venv\Datasets\Lung Cancer.csv")
 
 print("\n==== ORIGINAL DATA (HEAD) =====")
 print(df.head())
@@ -1,51 +1,56 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+from dataset_cache import load_csv
+from histogram_pipeline import render_histograms
+from summary_stats import summarize
 
-# 1. LOAD THE DATASET
-df = pd.read_csv("venv\Datasets\House Data.csv")
+HIST_WORKERS = None   # processes drawing the histograms (None / 1 = draw in this process)
+HIST_BINS = 30
 
-print("\n=== first 5 rows of dataset ===")
-print(df.head())
+def main():
+    # 1. LOAD THE DATASET
+    df = load_csv("venv\Datasets\House Data.csv")
 
-# Select numeric features only
-numeric_df = df.select_dtypes(include="number")
+    print("\n=== first 5 rows of dataset ===")
+    print(df.head())
 
-print("\n=== Numeric features ===")
-print(numeric_df.columns)
+    # Select numeric features only
+    numeric_df = df.select_dtypes(include="number")
 
-# 2. STANDARD DEVIATION
-print("\n=== Standard Deviation ===")
-print(numeric_df.std())
+    print("\n=== Numeric features ===")
+    print(numeric_df.columns)
 
-# 3. VARIANCE 
-print("\n=== Variance ===")
-print(numeric_df.var())
+    # std, variance and all percentiles from one pass over each column
+    stats = summarize(numeric_df, percentiles=(0.25, 0.50, 0.75))
 
-# 4. PERCENTILES (25TH, 50TH, 75TH)
-print("\n=== Percentile ===")
-print(numeric_df.quantile(0.25))
+    # 2. STANDARD DEVIATION
+    print("\n=== Standard Deviation ===")
+    print(stats["std"])
 
-print("\n=== Median (50th percentile) ===")
-print(numeric_df.quantile(0.50))
+    # 3. VARIANCE 
+    print("\n=== Variance ===")
+    print(stats["var"])
 
-print("\n=== 75th Percentile ===")
-print(numeric_df.quantile(0.75))
+    # 4. PERCENTILES (25TH, 50TH, 75TH)
+    print("\n=== Percentile ===")
+    print(stats[0.25])
 
-#. HISTOGRAM FOR EACH FEATURE
-print("\n=== Create Histogram for each numeric feature===")
+    print("\n=== Median (50th percentile) ===")
+    print(stats[0.50])
 
-for column in numeric_df.columns:
-    plt.figure(figsize=(6, 4))
-    plt.hist(numeric_df[column].dropna(), bins=30)
-    plt.title(f"Histogram of {column}")
-    plt.xlabel(column)
-    plt.ylabel("Frequency")
-    plt.grid(False)
+    print("\n=== 75th Percentile ===")
+    print(stats[0.75])
 
-    # Save each histogram as an image
-    plt.savefig(f"hist_{column}.png")
+    #. HISTOGRAM FOR EACH FEATURE
+    print("\n=== Create Histogram for each numeric feature===")
 
-    plt.close()
+    # bin counts precomputed per column, drawn headless (Agg) across a process pool;
+    # columns whose data has not changed since the last run are skipped
+    report = render_histograms(numeric_df, bins=HIST_BINS, workers=HIST_WORKERS)
+    skipped = sum(status == "unchanged" for _, _, status in report)
+    if skipped:
+        print(f"{skipped} of {len(report)} histograms unchanged since the last run - skipped")
 
-print("Histograms saved as image files.")
-print("=== DONE ===")
\ No newline at end of file
+    print("Histograms saved as image files.")
+    print("=== DONE ===")
+
+if __name__ == "__main__":
+    main()
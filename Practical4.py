@@ -1,6 +1,7 @@
 # build_decision_tree_id3.py
-# ID3 decision tree implementation from scratch (no external libraries).
-# Reads a CSV (categorical or numeric), prints step-by-step entropy and info gain,
+# ID3 decision tree implementation from scratch (no external libraries;
+# numpy is only used, if installed, for compiled batch prediction).
+# Streams a CSV (categorical or numeric) into typed columns, prints step-by-step entropy and info gain,
 # builds the tree and prints the ROOT node attribute.
 #
 # Usage: place cosmetics.csv in same folder and run:
@@ -8,126 +9,459 @@
 
 import csv
 import math
-from collections import defaultdict, Counter
-from copy import deepcopy
+from array import array
+from bisect import bisect_right
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, groupby, islice
+from multiprocessing import shared_memory
+
+from model_store import load_or_build
+
+try:
+    import numpy as np   # optional: only the compiled batch predictor needs it
+except ImportError:
+    np = None
 
 CSV_FILE = "venv\Datasets\Lipstick.csv"   # change if your file has a different name
 TARGET_COL = None            # if None, script uses last column as target
+SAMPLE_ROWS = 1000           # rows sampled to infer column types
+PARALLEL_WORKERS = None      # >1 to score attributes across that many processes
+PARALLEL_MIN_ROWS = 50000    # nodes smaller than this are scored serially
+MODEL_VERSION = 1            # bump to invalidate cached models after changing the builder
 
 # ---------------------------
-# Utilities
+# Columnar encoding
 # ---------------------------
-def read_csv(path):
-    with open(path, newline='', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        rows = list(reader)
-    header = [h.strip() for h in rows[0]]
-    data = [dict(zip(header, [cell.strip() for cell in row])) for row in rows[1:]]
-    return header, data
+def encode_column(values):
+    """
+    Integer-encode a column once. Returns {"kind": "categorical", "codes": array of
+    int codes, "levels": list mapping code -> original value (first-appearance order)}.
+    """
+    index = {}
+    codes = array('i', [index.setdefault(v, len(index)) for v in values])
+    return {"kind": "categorical", "codes": codes, "levels": list(index)}
 
+# ---------------------------
+# Utilities
+# ---------------------------
 def is_number(s):
     try:
         float(s)
         return True
-    except:
+    except ValueError:
         return False
 
-def maybe_convert_numeric(data, header):
+def load_columns(path, sample_rows=SAMPLE_ROWS, target=None):
     """
-    Convert columns that are numeric across all rows to floats.
-    Returns set of numeric columns.
+    Stream the CSV once into typed columns (no list of rows, no row dicts).
+    Column types are inferred from the first `sample_rows` rows:
+    - numeric columns -> {"kind": "numeric", "values": array('d')}, missing = nan
+    - other columns   -> dictionary-encoded, same layout as encode_column()
+    The target column (default: the last one) is always dictionary-encoded, so
+    0/1 class labels stay classes.
+    A numeric column that later meets a non-numeric value is demoted to categorical
+    and re-encoded from its raw text in a second pass over the file, so every value
+    keeps its original spelling.
+    Returns header, {"n_rows": n, "columns": {col: column}}.
     """
-    numeric_cols = set()
-    for col in header:
-        # check every non-empty value is numeric
-        vals = [row[col] for row in data if row[col] != ""]
-        if len(vals) > 0 and all(is_number(v) for v in vals):
-            numeric_cols.add(col)
-            for row in data:
-                if row[col] == "":
-                    row[col] = None
-                else:
-                    row[col] = float(row[col])
-    return numeric_cols
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        width = len(header)
+        target_j = header.index(target) if target in header else width - 1
+        sample = list(islice(reader, sample_rows))
 
-def discretize_numeric_column(data, col):
-    """Simple discretization: split by median into '<=med' and '>med'"""
-    vals = [row[col] for row in data if row[col] is not None]
-    if not vals:
-        return
-    med = sorted(vals)[len(vals)//2]
-    for row in data:
-        if row[col] is None:
-            row[col] = "missing"
+        # infer types: numeric if every non-empty sampled value parses as a number
+        numeric = []
+        for j in range(width):
+            vals = [row[j].strip() for row in sample if j < len(row) and row[j].strip() != ""]
+            numeric.append(j != target_j and len(vals) > 0 and all(is_number(v) for v in vals))
+
+        store = [array('d') if numeric[j] else array('i') for j in range(width)]
+        index = [None if numeric[j] else {} for j in range(width)]
+        demoted = set()
+
+        n_rows = 0
+        for row in chain(sample, reader):
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            for j in range(width):
+                if j in demoted:
+                    continue
+                cell = row[j].strip()
+                if numeric[j]:
+                    if cell == "":
+                        store[j].append(math.nan)
+                        continue
+                    try:
+                        store[j].append(float(cell))
+                        continue
+                    except ValueError:
+                        # demote: the column is re-encoded from its raw text below
+                        demoted.add(j)
+                        numeric[j] = False
+                        continue
+                store[j].append(index[j].setdefault(cell, len(index[j])))
+            n_rows += 1
+
+    if demoted:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            for j in demoted:
+                store[j], index[j] = array('i'), {}
+            for row in reader:
+                for j in demoted:
+                    cell = row[j].strip() if j < len(row) else ""
+                    store[j].append(index[j].setdefault(cell, len(index[j])))
+
+    columns = {}
+    for j, col in enumerate(header):
+        if numeric[j]:
+            columns[col] = {"kind": "numeric", "values": store[j]}
         else:
-            row[col] = "<=%.6g" % med if row[col] <= med else ">%.6g" % med
-    return med
+            columns[col] = {"kind": "categorical", "codes": store[j], "levels": list(index[j])}
+    return header, {"n_rows": n_rows, "columns": columns}
+
+def column_value(column, i):
+    """Decoded value of row i of a typed column (nan for missing numerics)."""
+    if column["kind"] == "numeric":
+        return column["values"][i]
+    return column["levels"][column["codes"][i]]
+
+def pair_codes(attr_codes, target_codes, n_classes):
+    """Fuse attribute and class codes into one key per row: value * n_classes + class."""
+    return array('i', [a * n_classes + y for a, y in zip(attr_codes, target_codes)])
+
+def presort(values, idx):
+    """Rows of idx that have a value (not nan), ordered by value; ties keep row order."""
+    return array('i', sorted([i for i in idx if values[i] == values[i]], key=values.__getitem__))
+
+def threshold_labels(threshold):
+    """Child labels of a numeric split, in slot order: <=t, >t, missing."""
+    return ("<=%.6g" % threshold, ">%.6g" % threshold, "missing")
 
 # ---------------------------
 # Entropy & Info Gain
 # ---------------------------
-def entropy(rows, target):
-    counts = Counter(r[target] for r in rows)
-    total = sum(counts.values())
+def entropy(counts):
+    """Entropy of a vector of class counts."""
+    total = sum(counts)
     ent = 0.0
-    for c in counts.values():
-        p = c / total
-        ent -= p * math.log2(p) if p>0 else 0
+    for c in counts:
+        if c > 0:
+            p = c / total
+            ent -= p * math.log2(p)
     return ent
 
-def info_gain(rows, attr, target):
-    base_entropy = entropy(rows, target)
-    # get value partitions
-    subsets = defaultdict(list)
-    for r in rows:
-        subsets[r[attr]].append(r)
-    total = len(rows)
+def contingency(pairs, n_classes, idx):
+    """
+    One counting pass over the rows in idx.
+    Returns {value_code: [count per class]} for the values present in idx.
+    """
+    table = {}
+    for key, c in Counter(map(pairs.__getitem__, idx)).items():
+        value, cls = divmod(key, n_classes)
+        row = table.get(value)
+        if row is None:
+            row = table[value] = [0] * n_classes
+        row[cls] = c
+    return table
+
+def info_gain(table):
+    """Information gain of a split given its value x class contingency table."""
+    class_totals = [sum(col) for col in zip(*table.values())]
+    total = sum(class_totals)
+    base_entropy = entropy(class_totals)
     remainder = 0.0
-    for vrows in subsets.values():
-        remainder += (len(vrows)/total) * entropy(vrows, target)
+    for row in table.values():
+        remainder += (sum(row) / total) * entropy(row)
     gain = base_entropy - remainder
     return gain
 
+def best_threshold(sorted_idx, values, target_codes, class_counts):
+    """
+    C4.5-style threshold search in one sweep over the node's presorted rows,
+    moving one row at a time from the right-hand to the left-hand class counts.
+    Rows without a value form a third 'missing' partition.
+    Returns (gain, threshold, [left, right, missing class counts]); the split sends
+    value <= threshold left. threshold is None when no cut improves on zero gain.
+    """
+    n_classes = len(class_counts)
+    total = sum(class_counts)
+    right = [0] * n_classes
+    for cls, c in Counter(map(target_codes.__getitem__, sorted_idx)).items():
+        right[cls] = c
+    missing = [a - b for a, b in zip(class_counts, right)]
+    fixed = entropy(class_counts) - (sum(missing) / total) * entropy(missing)
+
+    left = [0] * n_classes
+    n_left, n_right = 0, len(sorted_idx)
+    best_gain, best_t, best_split = 0.0, None, None
+    prev = None
+    for i in sorted_idx:
+        v = values[i]
+        if n_left and v != prev:
+            # candidate cut between prev and v
+            gain = fixed - (n_left / total) * entropy(left) - (n_right / total) * entropy(right)
+            if gain > best_gain:
+                best_gain, best_t, best_split = gain, prev, [left[:], right[:], missing]
+        cls = target_codes[i]
+        left[cls] += 1
+        right[cls] -= 1
+        n_left += 1
+        n_right -= 1
+        prev = v
+    return best_gain, best_t, best_split
+
 # ---------------------------
 # ID3 Tree builder
 # ---------------------------
-def majority_class(rows, target):
-    counts = Counter(r[target] for r in rows)
-    return counts.most_common(1)[0][0]
+def split_rows(idx, codes):
+    """Partition row indices by attribute code. Yields (code, rows) in code order."""
+    ordered = sorted(idx, key=codes.__getitem__)
+    for code, group in groupby(ordered, key=codes.__getitem__):
+        yield code, array('i', group)
+
+def partition_sorted(sorted_idx, child_of):
+    """Distribute a presorted row list among children in one pass, keeping the order."""
+    parts = {}
+    for i in sorted_idx:
+        key = child_of(i)
+        part = parts.get(key)
+        if part is None:
+            part = parts[key] = array('i')
+        part.append(i)
+    return parts
+
+def serial_scorer(dataset, pairs, target):
+    """
+    score(idx, sorted_idx, attributes, class_counts) -> {attr: (gain, threshold)},
+    computed in this process. Categorical attributes take one counting pass over
+    pairs[attr]; numeric ones (keys of sorted_idx) one threshold sweep.
+    """
+    columns = dataset["columns"]
+    target_codes = columns[target]["codes"]
+    n_classes = len(columns[target]["levels"])
+    def score(idx, sorted_idx, attributes, class_counts):
+        scores = {}
+        for attr in attributes:
+            if attr in sorted_idx:
+                gain, t, _ = best_threshold(sorted_idx[attr], columns[attr]["values"], target_codes, class_counts)
+                scores[attr] = (gain, t)
+            else:
+                scores[attr] = (info_gain(contingency(pairs[attr], n_classes, idx)), None)
+        return scores
+    return score
+
+def id3(dataset, attributes, target, max_depth=None, workers=PARALLEL_WORKERS,
+        parallel_min_rows=PARALLEL_MIN_ROWS):
+    """
+    Build an ID3 tree from typed columns (see load_columns). Categorical attributes
+    split multiway and are used once per path; numeric attributes split at the best
+    threshold found at each node and may be split again further down.
+    With workers > 1, nodes holding at least parallel_min_rows rows score their
+    attributes across a process pool that reads the encoded data from shared memory.
+    """
+    columns = dataset["columns"]
+    attributes = list(attributes)
+    idx = array('i', range(dataset["n_rows"]))
+    # sort every numeric column once; nodes only ever partition these lists
+    sorted_idx = {a: presort(columns[a]["values"], idx) for a in attributes if columns[a]["kind"] == "numeric"}
+
+    if not workers or workers <= 1 or len(attributes) < 2:
+        n_classes = len(columns[target]["levels"])
+        pairs = {a: pair_codes(columns[a]["codes"], columns[target]["codes"], n_classes)
+                 for a in attributes if a not in sorted_idx}
+        score = serial_scorer(dataset, pairs, target)
+        return grow_tree(dataset, score, idx, sorted_idx, attributes, target, 0, max_depth)
+
+    with SharedColumns(dataset, attributes, target) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_shared_columns,
+                                 initargs=shared.worker_args()) as pool:
+            score = parallel_scorer(shared, pool, workers, parallel_min_rows)
+            return grow_tree(dataset, score, idx, sorted_idx, attributes, target, 0, max_depth)
+
+def grow_tree(dataset, score, idx, sorted_idx, attributes, target, depth, max_depth):
+    columns = dataset["columns"]
+    class_levels = columns[target]["levels"]
+    class_counts = [0] * len(class_levels)
+    for cls, c in Counter(map(columns[target]["codes"].__getitem__, idx)).items():
+        class_counts[cls] = c
+    majority = class_levels[class_counts.index(max(class_counts))]
 
-def id3(rows, attributes, target, depth=0, max_depth=None):
     # If all rows have same target, return leaf
-    targets = set(r[target] for r in rows)
-    if len(targets) == 1:
-        return {"type":"leaf", "class": next(iter(targets))}
+    if max(class_counts) == len(idx):
+        return {"type":"leaf", "class": majority}
     if not attributes or (max_depth is not None and depth >= max_depth):
-        return {"type":"leaf", "class": majority_class(rows, target)}
+        return {"type":"leaf", "class": majority}
 
-    # compute info gain for each attribute
-    gains = {}
-    for attr in attributes:
-        gains[attr] = info_gain(rows, attr, target)
+    # compute info gain for each attribute (one counting pass / sweep each)
+    scores = score(idx, sorted_idx, attributes, class_counts)
 
     # choose best attribute
-    best_attr = max(gains, key=gains.get)
-    if gains[best_attr] <= 1e-12:
+    best_attr = max(scores, key=lambda a: scores[a][0])
+    gain, threshold = scores[best_attr]
+    if gain <= 1e-12:
         # no informative attribute -> leaf
-        return {"type":"leaf", "class": majority_class(rows, target)}
+        return {"type":"leaf", "class": majority}
 
-    tree = {"type":"node", "attribute": best_attr, "children": {}}
+    tree = {"type":"node", "attribute": best_attr, "class": majority, "children": {}}
 
-    # split dataset and recurse
-    values = set(r[best_attr] for r in rows)
-    for val in values:
-        subset = [r for r in rows if r[best_attr] == val]
-        if not subset:
-            tree["children"][val] = {"type":"leaf", "class": majority_class(rows, target)}
-        else:
-            # remaining attributes exclude best_attr
-            new_attrs = [a for a in attributes if a != best_attr]
-            tree["children"][val] = id3(subset, new_attrs, target, depth+1, max_depth)
+    if threshold is None:
+        # categorical: one child per value, attribute not reused below
+        codes = columns[best_attr]["codes"]
+        labels = columns[best_attr]["levels"]
+        new_attrs = [a for a in attributes if a != best_attr]
+        children = split_rows(idx, codes)
+        child_of = codes.__getitem__
+    else:
+        # numeric: <=t / >t / missing, attribute stays available
+        values = columns[best_attr]["values"]
+        tree["threshold"] = threshold
+        labels = threshold_labels(threshold)
+        new_attrs = attributes
+        own = sorted_idx[best_attr]
+        n_left = bisect_right(own, threshold, key=values.__getitem__)
+        missing = array('i', [i for i in idx if values[i] != values[i]])
+        children = [(k, rows) for k, rows in enumerate((own[:n_left], own[n_left:], missing)) if rows]
+        child_of = lambda i: 2 if values[i] != values[i] else (0 if values[i] <= threshold else 1)
+
+    # split every presorted numeric list the same way; no node ever re-sorts
+    parts = {a: partition_sorted(rows, child_of) for a, rows in sorted_idx.items() if a in new_attrs}
+    for key, subset in children:
+        child_sorted = {a: p.get(key, array('i')) for a, p in parts.items()}
+        tree["children"][labels[key]] = grow_tree(dataset, score, subset, child_sorted, new_attrs, target,
+                                                  depth+1, max_depth)
     return tree
 
+# ---------------------------
+# Parallel attribute scoring
+# ---------------------------
+class SharedColumns:
+    """
+    The encoded data in two shared-memory blocks, each made of n_rows-sized slots.
+    int32:   [node rows | target codes | one slot per attribute]
+    float64: [one slot per numeric attribute (its values)]
+    A categorical attribute's slot holds its pair codes; a numeric attribute's slot is
+    scratch space for the node's presorted rows. The parent fills the scratch slots
+    for the current node, so a task only carries positions and lengths.
+    """
+    def __init__(self, dataset, attributes, target):
+        self.dataset, self.target = dataset, target
+        columns = dataset["columns"]
+        n = self.n_rows = dataset["n_rows"]
+        self.n_classes = len(columns[target]["levels"])
+        self.position = {a: p for p, a in enumerate(attributes)}
+        numeric = [a for a in attributes if columns[a]["kind"] == "numeric"]
+        self.float_slot = {self.position[a]: s for s, a in enumerate(numeric)}
+
+        self.int_shm = self.float_shm = self.ints = self.floats = None
+        self.slots, self.pairs = [], {}
+        try:
+            # blocks are never empty (and stay a multiple of the item size) so that
+            # data without numeric attributes, or without rows, still maps cleanly
+            self.int_shm = shared_memory.SharedMemory(create=True, size=max(4, (len(attributes) + 2) * n * 4))
+            self.float_shm = shared_memory.SharedMemory(create=True, size=max(8, len(numeric) * n * 8))
+            self.ints = self.int_shm.buf.cast('i')
+            self.floats = self.float_shm.buf.cast('d')
+            self.slots = [self.int_slot(s) for s in range(len(attributes) + 2)]
+            target_codes = columns[target]["codes"]
+            self.slots[1][:] = target_codes
+            for a, p in self.position.items():
+                if p in self.float_slot:
+                    s = self.float_slot[p]
+                    self.floats[s * n:(s + 1) * n] = columns[a]["values"]
+                else:
+                    self.slots[p + 2][:] = pair_codes(columns[a]["codes"], target_codes, self.n_classes)
+                    self.pairs[a] = self.slots[p + 2]
+        except BaseException:
+            self.close()
+            raise
+
+    def int_slot(self, s):
+        return self.ints[s * self.n_rows:(s + 1) * self.n_rows]
+
+    def worker_args(self):
+        return (self.int_shm.name, self.float_shm.name, self.n_rows, self.n_classes, self.float_slot)
+
+    def publish(self, idx, sorted_idx, attributes):
+        """Write the node's rows and presorted lists; returns {position: list length}."""
+        self.slots[0][:len(idx)] = idx
+        lengths = {}
+        for a in attributes:
+            if a in sorted_idx:
+                p = self.position[a]
+                self.slots[p + 2][:len(sorted_idx[a])] = sorted_idx[a]
+                lengths[p] = len(sorted_idx[a])
+        return lengths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the views and unlink both blocks (safe on a half-built instance)."""
+        for view in self.slots + [self.ints, self.floats]:
+            if view is not None:
+                view.release()
+        for shm in (self.int_shm, self.float_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.slots, self.ints, self.floats, self.int_shm, self.float_shm = [], None, None, None, None
+
+_worker = {}
+
+def attach_shared_columns(int_name, float_name, n_rows, n_classes, float_slot):
+    """Process-pool initializer: map the parent's shared blocks once per worker."""
+    int_shm = shared_memory.SharedMemory(name=int_name)
+    float_shm = shared_memory.SharedMemory(name=float_name)
+    _worker.update(int_shm=int_shm, float_shm=float_shm, ints=int_shm.buf.cast('i'),
+                   floats=float_shm.buf.cast('d'), n_rows=n_rows, n_classes=n_classes,
+                   float_slot=float_slot)
+
+def score_positions(positions, n_idx, lengths, class_counts):
+    """Worker task: (gain, threshold) for the given attribute positions at the published node."""
+    ints, n = _worker["ints"], _worker["n_rows"]
+    idx = ints[:n_idx]
+    target_codes = ints[n:2 * n]
+    scores = {}
+    for p in positions:
+        slot = ints[(p + 2) * n:(p + 3) * n]
+        if p in lengths:
+            s = _worker["float_slot"][p]
+            values = _worker["floats"][s * n:(s + 1) * n]
+            gain, t, _ = best_threshold(slot[:lengths[p]], values, target_codes, class_counts)
+            scores[p] = (gain, t)
+        else:
+            scores[p] = (info_gain(contingency(slot, _worker["n_classes"], idx)), None)
+    return scores
+
+def parallel_scorer(shared, pool, workers, min_rows):
+    """score() that fans out to the pool for nodes with >= min_rows rows."""
+    serial = serial_scorer(shared.dataset, shared.pairs, shared.target)
+    def score(idx, sorted_idx, attributes, class_counts):
+        if len(idx) < min_rows or len(attributes) < 2:
+            return serial(idx, sorted_idx, attributes, class_counts)
+        # safe to overwrite: the tree is grown depth-first and we wait for every task
+        lengths = shared.publish(idx, sorted_idx, attributes)
+        positions = [shared.position[a] for a in attributes]
+        n_tasks = min(len(positions), workers * 2)
+        futures = []
+        for i in range(n_tasks):
+            chunk = positions[i::n_tasks]
+            futures.append(pool.submit(score_positions, chunk, len(idx),
+                                       {p: lengths[p] for p in chunk if p in lengths}, class_counts))
+        by_position = {}
+        for fut in futures:
+            by_position.update(fut.result())
+        return {a: by_position[shared.position[a]] for a in attributes}
+    return score
+
 def print_tree(node, indent=""):
     if node["type"] == "leaf":
         print(indent + "-> Leaf: class =", node["class"])
@@ -137,25 +471,142 @@ def print_tree(node, indent=""):
             print(indent + f"  If {node['attribute']} == {val}:")
             print_tree(child, indent + "    ")
 
+# ---------------------------
+# Compiled tree & batch prediction (needs numpy)
+# ---------------------------
+def compile_tree(tree, dataset, attributes, target):
+    """
+    Flatten the nested-dict tree into flat arrays, nodes numbered breadth-first:
+    - feature[n]    : attribute position for internal nodes, -1 for leaves
+    - threshold[n]  : split value of numeric nodes, nan for categorical ones
+    - child_base[n] : offset of node n's slots in `children`
+    - width[n]      : number of slots; slot = attribute code, or 0/1/2 for <=t / >t / missing
+    - children[...] : child node id per slot, -1 if that value was not seen at the node
+    - node_class[n] : leaf class code (majority class for internal nodes)
+    """
+    if np is None:
+        raise ImportError("numpy is required for compiled batch prediction")
+    columns = dataset["columns"]
+    position = {a: p for p, a in enumerate(attributes)}
+    class_code = {c: k for k, c in enumerate(columns[target]["levels"])}
+
+    feature, threshold, child_base, width, node_class, children = [], [], [], [], [], []
+    queue = deque([tree])
+    next_id = 1
+    while queue:
+        node = queue.popleft()
+        node_class.append(class_code[node["class"]])
+        if node["type"] == "leaf":
+            feature.append(-1)
+            threshold.append(math.nan)
+            child_base.append(0)
+            width.append(0)
+            continue
+        if "threshold" in node:
+            labels = threshold_labels(node["threshold"])
+            threshold.append(node["threshold"])
+        else:
+            labels = columns[node["attribute"]]["levels"]
+            threshold.append(math.nan)
+        slot_of = {v: s for s, v in enumerate(labels)}
+        slots = [-1] * len(labels)
+        for val, child in node["children"].items():
+            slots[slot_of[val]] = next_id
+            next_id += 1
+            queue.append(child)
+        feature.append(position[node["attribute"]])
+        child_base.append(len(children))
+        width.append(len(labels))
+        children.extend(slots)
+
+    return {
+        "attributes": list(attributes),
+        "levels": {a: list(columns[a]["levels"]) for a in attributes if columns[a]["kind"] == "categorical"},
+        "classes": list(columns[target]["levels"]),
+        "feature": np.asarray(feature, dtype=np.int32),
+        "threshold": np.asarray(threshold, dtype=np.float64),
+        "child_base": np.asarray(child_base, dtype=np.int32),
+        "width": np.asarray(width, dtype=np.int32),
+        "children": np.asarray(children, dtype=np.int32),
+        "node_class": np.asarray(node_class, dtype=np.int32),
+    }
+
+def encoded_matrix(dataset, attributes):
+    """
+    (n_rows, n_attributes) float64 matrix of the dataset's own columns:
+    categorical codes as floats, numeric values as-is (nan = missing).
+    """
+    columns = dataset["columns"]
+    return np.column_stack([np.frombuffer(columns[a]["values"], dtype=np.float64)
+                            if columns[a]["kind"] == "numeric"
+                            else np.frombuffer(columns[a]["codes"], dtype=np.int32)
+                            for a in attributes]).astype(np.float64, copy=False)
+
+def encode_batch(compiled, raw_columns):
+    """
+    Encode {attribute: sequence of raw values}: categorical values through the
+    training levels (unseen -> -1), numeric ones parsed as floats ("" / None -> nan).
+    """
+    encoded = []
+    for a in compiled["attributes"]:
+        values = raw_columns[a]
+        if a in compiled["levels"]:
+            lookup = {v: c for c, v in enumerate(compiled["levels"][a])}
+            encoded.append(np.fromiter((lookup.get(v, -1) for v in values), dtype=np.float64, count=len(values)))
+        else:
+            encoded.append(np.fromiter((math.nan if v is None or v == "" else float(v) for v in values),
+                                       dtype=np.float64, count=len(values)))
+    return np.column_stack(encoded)
+
+def predict_codes(compiled, X):
+    """
+    Score an encoded batch level by level: every pass moves all still-active rows
+    one step down with a few array gathers. Rows whose value was not seen at a node
+    stop there and take that node's majority class.
+    """
+    feature, threshold, child_base = compiled["feature"], compiled["threshold"], compiled["child_base"]
+    width, children = compiled["width"], compiled["children"]
+    X = np.asarray(X, dtype=np.float64)
+    node = np.zeros(len(X), dtype=np.int32)
+    active = np.arange(len(X))
+    while active.size:
+        cur = node[active]
+        feat = feature[cur]
+        internal = feat >= 0
+        active, cur, feat = active[internal], cur[internal], feat[internal]
+        x = X[active, feat]
+        t = threshold[cur]
+        # numeric nodes: slot 0 (<=t), 1 (>t) or 2 (missing); categorical: slot = code
+        slot = np.where(t == t, np.where(x != x, 2, x > t), np.nan_to_num(x, nan=-1)).astype(np.int32)
+        known = (slot >= 0) & (slot < width[cur])
+        nxt = np.full(len(active), -1, dtype=np.int32)
+        nxt[known] = children[child_base[cur[known]] + slot[known]]
+        moved = nxt >= 0
+        active = active[moved]
+        node[active] = nxt[moved]
+    return compiled["node_class"][node]
+
+def predict(compiled, X):
+    """Class labels for an encoded batch (see encoded_matrix / encode_batch)."""
+    return np.asarray(compiled["classes"], dtype=object)[predict_codes(compiled, X)]
+
 # ---------------------------
 # Main
 # ---------------------------
-def main():
-    header, data = read_csv(CSV_FILE)
+def train(path):
+    """Parse, report step by step and build the tree. Returns the model artifact."""
+    # Stream the CSV once into typed / dictionary-encoded columns
     global TARGET_COL
+    header, dataset = load_columns(path, target=TARGET_COL)
     if TARGET_COL is None:
         TARGET_COL = header[-1]
     print("Header columns:", header)
     print("Using target column:", TARGET_COL)
 
-    # Convert numeric-like columns to numeric types
-    numeric_cols = maybe_convert_numeric(data, header)
+    numeric_cols = {c for c, col in dataset["columns"].items() if col["kind"] == "numeric"}
     if numeric_cols:
+        # numeric columns are split at the best threshold of each node (C4.5-style)
         print("Detected numeric columns:", numeric_cols)
-        # discretize numeric columns into two bins so ID3 can handle them
-        for col in list(numeric_cols):
-            med = discretize_numeric_column(data, col)
-            print(f"Discretized numeric column '{col}' by median = {med}")
 
     # list of attributes (exclude target)
     attributes = [c for c in header if c != TARGET_COL]
@@ -163,28 +614,42 @@ def main():
 
     # Print dataset preview
     print("\nSample rows (first 8):")
-    for r in data[:8]:
-        print(r)
+    for i in range(min(8, dataset["n_rows"])):
+        print({c: column_value(dataset["columns"][c], i) for c in header})
+
+    target_col = dataset["columns"][TARGET_COL]
+    n_classes = len(target_col["levels"])
+    all_rows = range(dataset["n_rows"])
 
     # Compute and print base entropy of target
-    base_ent = entropy(data, TARGET_COL)
+    base_ent = entropy(list(Counter(target_col["codes"]).values()))
     print(f"\nBase entropy H({TARGET_COL}) = {base_ent:.6f}")
 
     # Compute info gain for each attribute and show step by step
     gains = {}
     print("\nInfo gains (step-by-step):")
+    class_counts = [0] * n_classes
+    for cls, c in Counter(target_col["codes"]).items():
+        class_counts[cls] = c
     for attr in attributes:
-        g = info_gain(data, attr, TARGET_COL)
+        col = dataset["columns"][attr]
+        if col["kind"] == "numeric":
+            g, t, split = best_threshold(presort(col["values"], all_rows), col["values"],
+                                         target_col["codes"], class_counts)
+            parts = {} if t is None else {label: counts for label, counts in zip(threshold_labels(t), split)
+                                          if sum(counts)}
+        else:
+            table = contingency(pair_codes(col["codes"], target_col["codes"], n_classes),
+                                n_classes, all_rows)
+            g = info_gain(table)
+            parts = {col["levels"][code]: counts for code, counts in table.items()}
         gains[attr] = g
 
         # print value partitions and entropies
-        subsets = defaultdict(list)
-        for r in data:
-            subsets[r[attr]].append(r)
         print(f"\nAttribute: {attr}")
-        for v, rows in subsets.items():
-            h = entropy(rows, TARGET_COL)
-            print(f"  Value '{v}': count={len(rows)}, entropy={h:.6f}")
+        for v, counts in parts.items():
+            h = entropy(counts)
+            print(f"  Value '{v}': count={sum(counts)}, entropy={h:.6f}")
         print(f"  => Information Gain for {attr} = {g:.6f}")
 
     # Determine root
@@ -194,8 +659,40 @@ def main():
 
     # Optionally build full tree and print (comment out if not required)
     print("\nBuilding full decision tree (ID3)...\n")
-    tree = id3(data, attributes, TARGET_COL)
+    tree = id3(dataset, attributes, TARGET_COL)
     print_tree(tree)
 
+    # Compile to flat arrays and score the training rows in one vectorized batch
+    compiled = None
+    if np is not None:
+        compiled = compile_tree(tree, dataset, attributes, TARGET_COL)
+        predicted = predict(compiled, encoded_matrix(dataset, attributes))
+        actual = np.asarray(target_col["levels"], dtype=object)[np.frombuffer(target_col["codes"], dtype=np.int32)]
+        print(f"\nCompiled tree: {len(compiled['feature'])} nodes, "
+              f"training accuracy = {np.mean(predicted == actual):.4f}")
+
+    return {"header": header, "target": TARGET_COL, "attributes": attributes,
+            "numeric_cols": sorted(numeric_cols), "gains": gains, "tree": tree, "compiled": compiled}
+
+def main():
+    # Reuse the fitted tree when neither the CSV nor the settings changed
+    settings = {"model": "id3", "version": MODEL_VERSION, "target": TARGET_COL, "sample_rows": SAMPLE_ROWS}
+    model, from_cache = load_or_build("id3", CSV_FILE, settings, lambda: train(CSV_FILE))
+    if not from_cache:
+        return
+
+    print(f"Loaded cached ID3 model for {CSV_FILE} (data and settings unchanged)")
+    print("Header columns:", model["header"])
+    print("Using target column:", model["target"])
+    print("\nInfo gains:")
+    for attr, g in model["gains"].items():
+        print(f"  {attr}: {g:.6f}")
+    root_attr = max(model["gains"], key=model["gains"].get)
+    print(f"\n=> ROOT NODE (attribute with highest information gain): {root_attr}")
+    print(f"   Information Gain = {model['gains'][root_attr]:.6f}\n")
+    print_tree(model["tree"])
+    if model["compiled"] is not None:
+        print(f"\nCompiled tree: {len(model['compiled']['feature'])} nodes")
+
 if __name__ == "__main__":
     main()
@@ -1,14 +1,18 @@
 
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 from sklearn.tree import DecisionTreeClassifier
 import sys
 from pandas.api import types as ptypes
 
+from model_store import load_or_build
+
 # ------------ User settings ------------
 CSV_FILE = "venv\Datasets\Lipstick.csv"   # <<-- change if your file has a different name
 TARGET_COL = "Buys"          # <<-- set to your target column name if different; otherwise it will fall back to last column
 DROP_COLS = ["Id"]           # columns to drop if present (non-features)
+MODEL_VERSION = 2            # bump to invalidate cached models after changing the training code
 # ---------------------------------------
 
 # ------------------ Helpers ------------------
@@ -43,56 +47,88 @@ def encode_dataframe(df, label_encoders):
             pass
     return df_enc
 
-def encode_test_value(col, val, col_dtype, label_encoders):
+def build_lookups(label_encoders):
+    """Precomputed lookup table (pandas Index over the training classes) per encoded column."""
+    return {col: pd.Index(le.classes_) for col, le in label_encoders.items()}
+
+def encode_range_tokens(values):
     """
-    Encodes a single test value according to the training column dtype / encoder.
-    - If column is numeric, expect val to be numeric or a special token like "<21" which we map to a numeric example.
-    - If column is categorical (LabelEncoder exists), encode with that encoder (error if unseen).
+    Vectorized numeric encoding of a raw test column.
+    Patterns like "<21" / ">30" map to a representative value one below / above the
+    boundary (0.0 / 100.0 if the boundary is not a number); anything else must parse,
+    and missing values (None / NaN) are rejected.
     """
-    if col in label_encoders:
-        le = label_encoders[col]
-        val_str = str(val)
-        if val_str not in le.classes_:
-            # unseen label — try to handle simple case differences (strip whitespace)
-            trimmed = val_str.strip()
-            if trimmed in le.classes_:
-                return int(le.transform([trimmed])[0])
-            # can't encode unseen label reliably — raise informative error
-            raise ValueError(f"Test value '{val}' for column '{col}' was not seen in training classes: {list(le.classes_)}")
-        return int(le.transform([val_str])[0])
-    else:
-        # column treated as numeric in training
-        if isinstance(val, str):
-            # handle patterns like "<21", "<=21", ">30" by mapping to a representative numeric value
-            s = val.strip()
-            if s.startswith("<"):
-                # choose a value one less than the boundary if numeric boundary present
-                try:
-                    bound = float(s[1:])
-                    return bound - 1.0
-                except:
-                    # fallback numeric
-                    return 0.0
-            if s.startswith(">"):
-                try:
-                    bound = float(s[1:])
-                    return bound + 1.0
-                except:
-                    return 100.0
-            if s.isdigit():
-                return float(s)
-            # not parseable: try float conversion
-            try:
-                return float(s)
-            except:
-                raise ValueError(f"Cannot convert test value '{val}' for numeric column '{col}' to a number.")
+    s = values.astype(str).str.strip()
+    out = pd.to_numeric(s, errors="coerce")
+    lt = s.str.startswith("<")
+    gt = s.str.startswith(">")
+    bound = pd.to_numeric(s.str[1:], errors="coerce")
+    out[lt] = (bound[lt] - 1.0).fillna(0.0)
+    out[gt] = (bound[gt] + 1.0).fillna(100.0)
+    bad = out.isna()
+    if bad.any():
+        raise ValueError(f"Cannot convert test values {list(values[bad].unique())} for numeric column "
+                         f"'{values.name}' to a number.")
+    return out.astype(float)
+
+def encode_test_frame(raw_df, model, on_unseen="error"):
+    """
+    Encode a whole DataFrame of raw test rows in one vectorized pass per column.
+    - categorical columns: lookup-table indexing; unseen labels are retried with
+      whitespace stripped, then raise (on_unseen="error") or take the training mode
+      (on_unseen="fill")
+    - numeric columns: range tokens and numbers parsed in bulk (encode_range_tokens);
+      missing values raise (on_unseen="error") or take the training mean (on_unseen="fill")
+    - features absent from raw_df are filled with the training mode / mean
+    Returns (encoded DataFrame in training feature order, list of filled feature names).
+    """
+    lookups = model["lookups"]
+    encoded, filled = {}, []
+    for col in model["feature_cols"]:
+        if col not in raw_df.columns:
+            encoded[col] = np.full(len(raw_df), model["fill_values"][col][1])
+            filled.append(col)
+        elif col in lookups:
+            vals = raw_df[col].astype(str)
+            codes = lookups[col].get_indexer(vals)
+            unseen = codes < 0
+            if unseen.any():
+                # unseen label — try to handle simple case differences (strip whitespace)
+                codes[unseen] = lookups[col].get_indexer(vals[unseen].str.strip())
+                unseen = codes < 0
+            if unseen.any():
+                if on_unseen != "fill":
+                    raise ValueError(f"Test values {list(raw_df[col][unseen].unique())} for column '{col}' were not "
+                                     f"seen in training classes: {list(lookups[col])}")
+                codes[unseen] = model["fill_values"][col][1]
+            encoded[col] = codes
         else:
-            return float(val)
+            vals = raw_df[col]
+            missing = vals.isna()
+            if missing.any():
+                if on_unseen != "fill":
+                    raise ValueError(f"Missing test values for numeric column '{col}' "
+                                     f"({int(missing.sum())} row(s)); the model was trained without missing values")
+                vals = vals.where(~missing, model["fill_values"][col][1])
+            encoded[col] = encode_range_tokens(vals).to_numpy()
+    return pd.DataFrame(encoded, columns=model["feature_cols"], index=raw_df.index), filled
 
-# ------------------ Main ------------------
-def main():
+def predict_frame(model, raw_df, on_unseen="error"):
+    """Encode raw test rows in bulk and score them with a single clf.predict call."""
+    test_df, _ = encode_test_frame(raw_df, model, on_unseen)
+    pred = model["clf"].predict(test_df)
+    if model["target"] in model["label_encoders"]:
+        pred = model["label_encoders"][model["target"]].inverse_transform(pred)
+    return pred
+
+# ------------------ Training ------------------
+def train_model(path):
+    """
+    Load, encode and fit. Returns the model artifact: classifier, label encoders,
+    feature order, target and per-feature fill values for missing test inputs.
+    """
     # 1) Load dataset
-    df = safe_load_csv(CSV_FILE)
+    df = safe_load_csv(path)
     print("Columns in dataset:", list(df.columns))
     # Determine target column
     target = TARGET_COL if TARGET_COL in df.columns else ensure_target_in_df(df, TARGET_COL)
@@ -131,6 +167,44 @@ def main():
     clf.fit(X, y)
     print("Decision Tree trained successfully.")
 
+    # Fill values for features missing from a test input:
+    # categorical -> training mode (raw, encoded); numeric -> training mean
+    fill_values = {}
+    for col in X.columns:
+        if col in label_encoders:
+            mode_val = df[col].mode().iloc[0]
+            fill_values[col] = (mode_val, int(label_encoders[col].transform([str(mode_val)])[0]))
+        else:
+            mean_val = float(X[col].mean())
+            fill_values[col] = (mean_val, mean_val)
+
+    return {"clf": clf, "label_encoders": label_encoders, "lookups": build_lookups(label_encoders),
+            "feature_cols": list(X.columns), "target": target, "original_dtypes": original_dtypes,
+            "fill_values": fill_values}
+
+def load_model(path=CSV_FILE):
+    """(model, from_cache): reuse the fitted model when neither the CSV nor the settings changed."""
+    settings = {"model": "sklearn-tree", "version": MODEL_VERSION, "target": TARGET_COL,
+                "drop": DROP_COLS, "criterion": "entropy", "random_state": 0}
+    try:
+        return load_or_build("practical5", path, settings, lambda: train_model(path))
+    except FileNotFoundError:
+        print(f"Error: file '{path}' not found. Put your dataset in the same folder or update CSV_FILE.")
+        sys.exit(1)
+
+# ------------------ Main ------------------
+def main():
+    model, from_cache = load_model(CSV_FILE)
+    if from_cache:
+        print(f"Loaded cached model for {CSV_FILE} (data and settings unchanged)")
+        print("Using target column:", model["target"])
+        print("Feature columns:", model["feature_cols"])
+
+    clf = model["clf"]
+    label_encoders = model["label_encoders"]
+    feature_cols = model["feature_cols"]
+    target = model["target"]
+
     # 7) Prepare the test sample as per assignment:
     # Test Data: [Age < 21, Income = Low, Gender = Female, MaritalStatus = Married]
     # IMPORTANT: the exact column names must match your dataset's column names.
@@ -143,12 +217,12 @@ def main():
     }
 
     # Verify that all keys exist (if not, try to find close matches or error)
-    missing_cols = [c for c in test_sample_raw.keys() if c not in X.columns]
+    missing_cols = [c for c in test_sample_raw.keys() if c not in feature_cols]
     if missing_cols:
         print(f"\nWarning: The following test columns are not present in training features: {missing_cols}")
-        print("Training features are:", list(X.columns))
+        print("Training features are:", feature_cols)
         # Try some common alternatives (case-insensitive) to map names
-        lowered = {col.lower(): col for col in X.columns}
+        lowered = {col.lower(): col for col in feature_cols}
         mapping = {}
         for mc in missing_cols:
             if mc.lower() in lowered:
@@ -157,39 +231,28 @@ def main():
             print("Auto-mapping test columns:", mapping)
             for old, new in mapping.items():
                 test_sample_raw[new] = test_sample_raw.pop(old)
-            missing_cols = [c for c in test_sample_raw.keys() if c not in X.columns]
+            missing_cols = [c for c in test_sample_raw.keys() if c not in feature_cols]
         if missing_cols:
             print("Cannot find matching columns for:", missing_cols)
             print("Please adjust test_sample_raw keys to match your dataset's feature names (exact match). Exiting.")
             sys.exit(1)
 
-    # 8) Encode test sample values consistent with training
-    test_encoded = {}
-    for col in X.columns:
-        if col in test_sample_raw:
-            dt = original_dtypes.get(col)
-            try:
-                test_encoded[col] = encode_test_value(col, test_sample_raw[col], dt, label_encoders)
-            except ValueError as e:
-                print("Encoding error:", e)
-                sys.exit(1)
+    # 8) Encode test sample values consistent with training (batch path, one row here)
+    raw_df = pd.DataFrame([test_sample_raw])
+    try:
+        test_df, filled = encode_test_frame(raw_df, model)
+    except ValueError as e:
+        print("Encoding error:", e)
+        sys.exit(1)
+    # Features not provided in the test sample are filled with the training mode (categorical)
+    # or mean (numeric)
+    for col in filled:
+        raw_val = model["fill_values"][col][0]
+        if col in label_encoders:
+            print(f"Note: feature '{col}' missing in test input — filled with training mode '{raw_val}'.")
         else:
-            # If a feature was not provided in test_sample, we must supply a value.
-            # Strategy: use the column's most frequent value from training (after encoding).
-            # For numeric columns use mean; for categorical use mode.
-            if col in label_encoders:
-                # categorical: mode in original (unencoded) df
-                mode_val = df[col].mode().iloc[0]
-                test_encoded[col] = int(label_encoders[col].transform([str(mode_val)])[0])
-                print(f"Note: feature '{col}' missing in test input — filled with training mode '{mode_val}'.")
-            else:
-                # numeric: fill with mean
-                mean_val = X[col].mean()
-                test_encoded[col] = float(mean_val)
-                print(f"Note: numeric feature '{col}' missing in test input — filled with training mean {mean_val:.4f}.")
-
-    # Create DataFrame for prediction
-    test_df = pd.DataFrame([test_encoded], columns=X.columns)
+            print(f"Note: numeric feature '{col}' missing in test input — filled with training mean {raw_val:.4f}.")
+
     print("\nEncoded test sample (features in training order):")
     print(test_df)
 
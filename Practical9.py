@@ -1,4 +1,4 @@
-import math
+from kmeans_engine import assign_step, cluster_means, cluster_members, kmeans_steps, named_points
 
 # Given points
 points = {
@@ -11,21 +11,18 @@ points = {
     "p7": (0.24, 0.1),
     "p8": (0.3, 0.2),
 }
+METRIC = "euclidean"   # also "manhattan" or "cosine"
+FULL_RUN = False       # True: after the questions, iterate assign/update until the clusters stop changing
 
-# Initial centroids 
-m1 = points["p1"]
-m2 = points["p8"]
+# Points as one array (any dimension) plus a name -> row index
+names, index, X = named_points(points)
 
-def euclidean(a, b):
-    return math.sqrt((a[0]-b[0])**2 + (a[1]-b[1])**2)
+# Initial centroids 
+centroids = X[[index["p1"], index["p8"]]]
 
-# Assign each point to nearest centroid 
-assignments = {}
-for name, coord in points.items():
-    d1 = euclidean(coord, m1)
-    d2 = euclidean(coord, m2)
-    cluster = 1 if d1 <= d2 else 2
-    assignments[name] = cluster
+# Assign each point to nearest centroid (one vectorized step, ties go to cluster 1)
+labels = assign_step(X, centroids, METRIC)
+assignments = {name: int(c) + 1 for name, c in zip(names, labels)}
 
 # print assignments
 print("Print assignments (nearest centroid):")
@@ -35,21 +32,22 @@ for name in sorted(points.keys(), key=lambda x: int(x[1:])):
 print("\nAnswer 1) P6 belongs to cluster", assignments["p6"])
 
 # 2) Population of the cluster around m2
-cluster2_points= [name for name, c in assignments.items() if c == 2]
+cluster1_points, cluster2_points = cluster_members(names, labels, len(centroids))
 print("Answer 2) Points in cluster around m2 (Cluster 2):", cluster2_points)
 print("          Population (size) of cluster around m2 = ", len(cluster2_points))
 
-# 3) Updated centroids 
-def mean_of_points(names_list):
-    xs = [points[n][0] for n in names_list]
-    ys = [points[n][1] for n in names_list]
-    return (sum(xs) / len(xs), sum(ys) / len(ys))
-
-cluster1_points = [name for name, c in assignments.items() if c == 1]
-
-m1_updated = mean_of_points(cluster1_points)
-m2_updated = mean_of_points(cluster2_points)
+# 3) Updated centroids (all cluster means in one pass)
+(m1_updated, m2_updated), _ = cluster_means(X, labels, len(centroids))
 
 print("\n Answer 3) updated centroids after assignment:")
-print(f" Updated m1 (centroid of cluster 1) = ({m1_updated[0]:.6f}, {m2_updated[1]:.6f})")
-print(f" Updated m2 (centroid of cluster 2) = ({m2_updated[0]:.6f}, {m2_updated[1]:.6f})")
\ No newline at end of file
+print(f" Updated m1 (centroid of cluster 1) = ({m1_updated[0]:.6f}, {m1_updated[1]:.6f})")
+print(f" Updated m2 (centroid of cluster 2) = ({m2_updated[0]:.6f}, {m2_updated[1]:.6f})")
+
+# Optional: the full k-means run from the same initial centroids, step by step
+if FULL_RUN:
+    print("\nFull run until the clusters stop changing:")
+    for it, step_labels, step_centroids in kmeans_steps(X, centroids, METRIC):
+        members = cluster_members(names, step_labels, len(step_centroids))
+        for c, (m, pts) in enumerate(zip(step_centroids, members), start=1):
+            coords = ", ".join(f"{v:.6f}" for v in m)
+            print(f"  step {it}: m{c} = ({coords}) <- {pts}")
@@ -0,0 +1,171 @@
+# bench_decision_tree.py
+# Scaling benchmarks for the decision-tree code paths:
+#   - Practical4: entropy/info_gain (root gain scan), best_threshold, id3 build,
+#     compiled batch prediction
+#   - Practical23: the NumPy entropy() on a class column
+# over a grid of row counts, attribute counts and cardinalities, on synthetic data.
+# Results are written as JSON so two versions can be compared with --compare.
+#
+# Usage:
+#    python bench_decision_tree.py --rows 10000,100000 --attrs 5,20 --cardinality 3,10
+#    python bench_decision_tree.py --out new.json --compare old.json
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+from array import array
+from collections import Counter
+from itertools import product
+
+import Practical4 as p4
+from bench_utils import best_time, int_list
+
+N_CLASSES = 3
+SEED = 0
+
+# ---------------------------
+# Synthetic data
+# ---------------------------
+def make_dataset(n_rows, n_attrs, cardinality, numeric_fraction=0.0, seed=SEED):
+    """
+    Dataset in Practical4's columnar layout. The class depends on the first two
+    attributes plus 10% label noise, so trees have real structure to find.
+    """
+    rng = random.Random(seed)
+    n_numeric = int(round(n_attrs * numeric_fraction))
+    columns = {}
+    signal = [0] * n_rows
+    for j in range(n_attrs):
+        name = f"a{j}"
+        if j < n_numeric:
+            values = array('d', [rng.gauss(0.0, 1.0) for _ in range(n_rows)])
+            columns[name] = {"kind": "numeric", "values": values}
+            if j < 2:
+                signal = [s + (v > 0) for s, v in zip(signal, values)]
+        else:
+            codes = [rng.randrange(cardinality) for _ in range(n_rows)]
+            columns[name] = p4.encode_column(f"v{c}" for c in codes)
+            if j < 2:
+                signal = [s + c for s, c in zip(signal, codes)]
+    labels = [f"c{s % N_CLASSES}" if rng.random() > 0.1 else f"c{rng.randrange(N_CLASSES)}" for s in signal]
+    columns["target"] = p4.encode_column(labels)
+    attributes = [f"a{j}" for j in range(n_attrs)]
+    return {"n_rows": n_rows, "columns": columns}, attributes
+
+# ---------------------------
+# Timed operations
+# ---------------------------
+def root_gains(dataset, attributes):
+    """One full gain scan at the root: what a single tree level costs per attribute."""
+    columns = dataset["columns"]
+    target = columns["target"]
+    n_classes = len(target["levels"])
+    rows = range(dataset["n_rows"])
+    class_counts = [0] * n_classes
+    for c in target["codes"]:
+        class_counts[c] += 1
+    gains = {}
+    for a in attributes:
+        col = columns[a]
+        if col["kind"] == "numeric":
+            gains[a] = p4.best_threshold(p4.presort(col["values"], rows), col["values"], target["codes"], class_counts)[0]
+        else:
+            gains[a] = p4.info_gain(p4.contingency(p4.pair_codes(col["codes"], target["codes"], n_classes), n_classes, rows))
+    return gains
+
+def load_practical23_entropy():
+    """Practical23 is a script; import it quietly to get its entropy(), or None without pandas."""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import Practical23
+    except ImportError:
+        return None
+    return Practical23.entropy
+
+def bench_case(n_rows, n_attrs, cardinality, numeric_fraction, max_depth, repeat, workers, np23_entropy):
+    dataset, attributes = make_dataset(n_rows, n_attrs, cardinality, numeric_fraction)
+    result = {"rows": n_rows, "attrs": n_attrs, "cardinality": cardinality,
+              "numeric_fraction": numeric_fraction, "max_depth": max_depth}
+
+    result["entropy_s"], _ = best_time(
+        lambda: p4.entropy(list(Counter(dataset["columns"]["target"]["codes"]).values())), repeat)
+    result["root_gains_s"], _ = best_time(lambda: root_gains(dataset, attributes), repeat)
+    result["build_s"], tree = best_time(
+        lambda: p4.id3(dataset, attributes, "target", max_depth=max_depth, workers=workers), repeat)
+    result["build_rows_per_s"] = n_rows / result["build_s"]
+
+    if p4.np is not None:
+        compiled = p4.compile_tree(tree, dataset, attributes, "target")
+        X = p4.encoded_matrix(dataset, attributes)
+        result["nodes"] = int(len(compiled["feature"]))
+        result["predict_s"], _ = best_time(lambda: p4.predict_codes(compiled, X), repeat)
+        result["predict_rows_per_s"] = n_rows / result["predict_s"]
+    if np23_entropy is not None:
+        labels = p4.np.asarray(dataset["columns"]["target"]["levels"])[
+            p4.np.frombuffer(dataset["columns"]["target"]["codes"], dtype=p4.np.int32)]
+        result["np_entropy_s"], _ = best_time(lambda: np23_entropy(labels), repeat)
+    return result
+
+# ---------------------------
+# Reporting
+# ---------------------------
+TIMED_KEYS = ("entropy_s", "root_gains_s", "build_s", "predict_s", "np_entropy_s")
+CASE_KEYS = ("rows", "attrs", "cardinality", "numeric_fraction", "max_depth")
+
+def print_row(r):
+    cells = [f"{r['rows']:>9}", f"{r['attrs']:>5}", f"{r['cardinality']:>4}", f"{r['numeric_fraction']:>4.2f}"]
+    cells += [f"{r[k]:>10.4f}" if k in r else f"{'-':>10}" for k in TIMED_KEYS]
+    print(" ".join(cells))
+
+def compare(results, baseline_path):
+    """Print new/old time ratios for cases present in both runs (>1 = slower now)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {tuple(r[k] for k in CASE_KEYS): r for r in json.load(f)["results"]}
+    print(f"\nRatio vs {baseline_path} (new / old):")
+    for r in results:
+        old = baseline.get(tuple(r[k] for k in CASE_KEYS))
+        if old is None:
+            continue
+        ratios = [f"{k}={r[k] / old[k]:.2f}" for k in TIMED_KEYS if k in r and old.get(k)]
+        print(f"  rows={r['rows']} attrs={r['attrs']} card={r['cardinality']}: " + ", ".join(ratios))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decision-tree scaling benchmarks")
+    parser.add_argument("--rows", type=int_list, default=[1000, 10000, 100000])
+    parser.add_argument("--attrs", type=int_list, default=[5, 20])
+    parser.add_argument("--cardinality", type=int_list, default=[3, 10])
+    parser.add_argument("--numeric-fraction", type=float, default=0.0,
+                        help="share of attributes generated as numeric columns")
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size for id3")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    np23_entropy = load_practical23_entropy() if p4.np is not None else None
+    print(f"{'rows':>9} {'attrs':>5} {'card':>4} {'num':>4} " + " ".join(f"{k:>10}" for k in TIMED_KEYS))
+    results = []
+    for n_rows, n_attrs, card in product(args.rows, args.attrs, args.cardinality):
+        r = bench_case(n_rows, n_attrs, card, args.numeric_fraction, args.max_depth,
+                       args.repeat, args.workers, np23_entropy)
+        print_row(r)
+        results.append(r)
+
+    meta = {"python": sys.version.split()[0], "platform": platform.platform(),
+            "numpy": getattr(p4.np, "__version__", None), "repeat": args.repeat, "workers": args.workers,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print("\nResults written to", args.out)
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench_kmeans.py
+# Brute-force (chunked GEMM) vs kd-tree assignment in kmeans_engine over a grid
+# of dimensions and cluster counts, on synthetic blobs. Every case checks that
+# both backends give identical labels, and the report lists, per dimension, the
+# smallest k from which the kd-tree wins - the numbers behind KDTREE_MAX_FEATURES
+# and KDTREE_MIN_CLUSTERS. Before the grid, silhouette_score_sampled is checked
+# against sklearn.metrics.silhouette_score (when sklearn is installed), including
+# a labelling with an empty cluster.
+#
+# Usage:
+#    python bench_kmeans.py --rows 200000 --dims 2,3,4,8 --clusters 8,32,128,512
+
+import argparse
+import json
+import platform
+import sys
+import time
+from itertools import product
+
+import numpy as np
+
+import kmeans_engine as ke
+from bench_utils import best_time, int_list
+
+try:
+    from sklearn.metrics import silhouette_score
+except ImportError:  # silhouette check skipped
+    silhouette_score = None
+
+SEED = 0
+
+def make_blobs(n_rows, n_features, n_clusters, seed=SEED):
+    """Gaussian blobs around random centers, plus the centers perturbed as centroids."""
+    rs = np.random.RandomState(seed)
+    centers = rs.uniform(-10.0, 10.0, size=(n_clusters, n_features))
+    X = centers[rs.randint(n_clusters, size=n_rows)] + rs.randn(n_rows, n_features)
+    return X, centers + 0.1 * rs.randn(n_clusters, n_features)
+
+def bench_case(n_rows, n_features, n_clusters, repeat):
+    X, C = make_blobs(n_rows, n_features, n_clusters)
+    result = {"rows": n_rows, "dims": n_features, "clusters": n_clusters}
+    result["brute_s"], (brute, _) = best_time(lambda: ke.assign_labels(X, C, backend="brute"), repeat)
+    result["kdtree_s"], (tree, _) = best_time(lambda: ke.assign_labels(X, C, backend="kdtree"), repeat)
+    result["identical"] = bool(np.array_equal(brute, tree))
+    result["speedup"] = result["brute_s"] / result["kdtree_s"]
+    return result
+
+def check_silhouette(n_rows=2000, n_features=3, n_clusters=6):
+    """
+    {case: (ours, sklearn's)} for blob labels and for the same labels with one
+    cluster emptied; None when sklearn is not installed.
+    """
+    if silhouette_score is None:
+        return None
+    X, C = make_blobs(n_rows, n_features, n_clusters)
+    labels, _ = ke.assign_labels(X, C)
+    emptied = np.where(labels == 1, 0, labels)   # label 1 has no members
+    return {case: (ke.silhouette_score_sampled(X, lab, n_clusters), float(silhouette_score(X, lab)))
+            for case, lab in (("blobs", labels), ("empty cluster", emptied))}
+
+def crossover(results):
+    """{dims: smallest k where the kd-tree was faster (None if never)}."""
+    out = {}
+    for r in sorted(results, key=lambda r: (r["dims"], r["clusters"])):
+        out.setdefault(r["dims"], None)
+        if out[r["dims"]] is None and r["speedup"] > 1.0:
+            out[r["dims"]] = r["clusters"]
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="k-means assignment backend benchmark")
+    parser.add_argument("--rows", type=int_list, default=[200000])
+    parser.add_argument("--dims", type=int_list, default=[2, 3, 4, 6, 8])
+    parser.add_argument("--clusters", type=int_list, default=[4, 8, 16, 32, 64, 128, 256, 512])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="bench_kmeans.json")
+    args = parser.parse_args(argv)
+    if ke.cKDTree is None:
+        parser.error("scipy is required for the kd-tree backend")
+
+    silhouettes = check_silhouette()
+    if silhouettes is None:
+        print("sklearn not installed - silhouette check skipped\n")
+    else:
+        for case, (ours, ref) in silhouettes.items():
+            print(f"silhouette ({case}): {ours:.6f} vs sklearn {ref:.6f} - "
+                  f"{'match' if np.isclose(ours, ref, rtol=1e-6, atol=1e-9) else 'MISMATCH'}")
+        print()
+
+    print(f"{'rows':>9} {'dims':>4} {'k':>5} {'brute_s':>10} {'kdtree_s':>10} {'speedup':>8} identical")
+    results = []
+    for n_rows, dims, k in product(args.rows, args.dims, args.clusters):
+        r = bench_case(n_rows, dims, k, args.repeat)
+        print(f"{r['rows']:>9} {r['dims']:>4} {r['clusters']:>5} {r['brute_s']:>10.4f} "
+              f"{r['kdtree_s']:>10.4f} {r['speedup']:>8.2f} {r['identical']}")
+        results.append(r)
+
+    print("\nkd-tree faster from k =")
+    for dims, k in crossover(results).items():
+        print(f"  d={dims}: {k if k is not None else 'never (in this grid)'}")
+    print(f"auto uses the kd-tree for d <= {ke.KDTREE_MAX_FEATURES} and k >= {ke.KDTREE_MIN_CLUSTERS}")
+
+    meta = {"python": sys.version.split()[0], "platform": platform.platform(),
+            "numpy": np.__version__, "repeat": args.repeat, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "silhouette": silhouettes, "results": results}, f, indent=2)
+    print("\nResults written to", args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# bench_utils.py
+# Timing and command-line helpers shared by the benchmark scripts
+# (bench_decision_tree.py, bench_kmeans.py). Imports nothing from the practicals.
+
+import math
+import time
+
+def best_time(fn, repeat):
+    """Best wall time of `repeat` runs (seconds) and the last result."""
+    best, result = math.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def int_list(s):
+    return [int(x) for x in s.split(",") if x]
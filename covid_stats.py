@@ -0,0 +1,267 @@
+# covid_stats.py
+# State-wise aggregation of "Covid Vaccine Statewise.csv" (Practical13, Practical14).
+#
+# Only the State column and the counts being aggregated are loaded (through the
+# dataset cache), State is made categorical, and the maxima of all counts are
+# computed in one grouped pass instead of one groupby per column.
+#
+# StateStore keeps the same per-state results on disk (running max, the latest
+# reported cumulative count, last-updated date) together with a watermark per
+# source file: the byte offset up to which the file has been ingested, a SHA-256
+# of all bytes before it, and the file's size and mtime. A file whose size and
+# mtime are unchanged is skipped without reading it. Otherwise the ingested
+# prefix is re-hashed (read, not parsed); if it still matches, only the rows
+# after the watermark are parsed, so a daily append costs the new rows plus one
+# sequential read. A source that shrank or whose ingested bytes changed anywhere
+# was rewritten rather than appended to, and the store is rebuilt from all its
+# sources. Queries read one record per state.
+
+import argparse
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_csv
+from model_store import HASH_CHUNK
+
+VACCINE_CSV = r"venv\Datasets\Covid Vaccine Statewise.csv"
+STATE = "State"
+FIRST_DOSE = "First Dose Administered"
+SECOND_DOSE = "Second Dose Administered"
+MALE = "Male(Individuals Vaccinated)"
+FEMALE = "Female(Individuals Vaccinated)"
+COUNT_COLUMNS = [FIRST_DOSE, SECOND_DOSE, MALE, FEMALE]
+UPDATED_ON = "Updated On"
+DATE_FORMAT = "%d/%m/%Y"
+STORE_PATH = ".covid_store.json"
+STORE_VERSION = 2
+APPEND_BLOCK = 64 << 20   # bytes of new rows parsed at a time
+
+def load_statewise(path=VACCINE_CSV, columns=COUNT_COLUMNS):
+    """State plus the given count columns, with State as a categorical."""
+    df = load_csv(path, columns=[STATE, *columns])
+    df[STATE] = df[STATE].astype("category")
+    return df
+
+def state_maxima(df, columns=COUNT_COLUMNS):
+    """Per-state maximum of every column in one grouped pass (index: State, sorted)."""
+    return df.groupby(STATE, observed=True, sort=True)[list(columns)].max()
+
+def statewise_maxima(path=VACCINE_CSV, columns=COUNT_COLUMNS):
+    """Entry point: load only what is needed and return the per-state maxima table."""
+    return state_maxima(load_statewise(path, columns), columns)
+
+def ranked(maxima, column):
+    """One column of the maxima table, largest first - what the practicals print."""
+    return maxima[column].sort_values(ascending=False)
+
+def hash_range(h, f, start, end):
+    """Feed bytes [start, end) of an open file into the hash object h; returns h."""
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = f.read(min(HASH_CHUNK, remaining))
+        if not chunk:
+            break
+        h.update(chunk)
+        remaining -= len(chunk)
+    return h
+
+def row_blocks(f, start, end):
+    """Bytes [start, end) of an open file in blocks of whole lines (the last block may be unterminated)."""
+    f.seek(start)
+    carry, pos = b"", start
+    while pos < end:
+        data = f.read(min(APPEND_BLOCK, end - pos))
+        pos += len(data)
+        data = carry + data
+        cut = len(data) if pos >= end else data.rfind(b"\n") + 1
+        block, carry = data[:cut], data[cut:]
+        if block.strip():
+            yield block
+
+def json_value(x, dtype):
+    if pd.isna(x):
+        return None
+    return int(x) if np.dtype(dtype).kind in "iu" else float(x)
+
+class StateStore:
+    """
+    Persistent per-state aggregates of the statewise feed, updated from appended rows.
+    For every state and tracked column: the maximum, and the latest reported value
+    (the feed's counts are cumulative, so this is the state's cumulative total) with
+    its date; plus the state's row count and last-updated date.
+    """
+    def __init__(self, columns=COUNT_COLUMNS):
+        self.columns = list(columns)
+        self.dtypes = {}
+        self.states = {}
+        self.sources = {}
+
+    @classmethod
+    def load(cls, path=STORE_PATH, columns=COUNT_COLUMNS):
+        """The store saved at path; an empty one if it is missing, unreadable or tracks other columns."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return cls(columns)
+        if saved.get("version") != STORE_VERSION or saved.get("columns") != list(columns):
+            return cls(columns)
+        store = cls(columns)
+        store.dtypes, store.states, store.sources = saved["dtypes"], saved["states"], saved["sources"]
+        return store
+
+    def save(self, path=STORE_PATH):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": STORE_VERSION, "columns": self.columns, "dtypes": self.dtypes,
+                       "states": self.states, "sources": self.sources}, f, indent=1)
+        os.replace(tmp, path)
+        return self
+
+    def ingest(self, path, hold_partial=False):
+        """
+        Fold the rows of path written since its watermark into the store; returns the
+        number of new rows. hold_partial=True leaves a last line without a newline for
+        the next call (for files that are still being written).
+        """
+        key = os.path.abspath(path)
+        mark = self.sources.get(key)
+        st = os.stat(path)
+        size = st.st_size
+        if mark is not None and mark["size"] == size and mark["mtime_ns"] == st.st_mtime_ns:
+            return 0
+        with open(path, "rb") as f:
+            if mark is None:
+                f.seek(0)
+                header = f.readline()
+                names = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+                mark = {"offset": len(header), "names": names, "rows": 0}
+                h = hash_range(hashlib.sha256(), f, 0, mark["offset"])
+            else:
+                if size < mark["offset"]:
+                    return self.rebuild(extra=path, hold_partial=hold_partial)
+                h = hash_range(hashlib.sha256(), f, 0, mark["offset"])
+                if h.hexdigest() != mark["sha256"]:
+                    return self.rebuild(extra=path, hold_partial=hold_partial)
+            end = size
+            if hold_partial:
+                f.seek(max(mark["offset"], size - APPEND_BLOCK))
+                end = f.tell() + f.read().rfind(b"\n") + 1
+                end = max(end, mark["offset"])
+            usecols = [STATE, UPDATED_ON, *self.columns]
+            missing = [c for c in usecols if c not in mark["names"]]
+            if missing:
+                raise KeyError(f"{missing} not in columns of {path}")
+            new_rows = 0
+            for block in row_blocks(f, mark["offset"], end):
+                df = pd.read_csv(io.BytesIO(block), header=None, names=mark["names"], usecols=usecols)
+                self.update(df)
+                new_rows += len(df)
+            hash_range(h, f, mark["offset"], end)
+            mark = dict(mark, offset=end, sha256=h.hexdigest(), size=size, mtime_ns=st.st_mtime_ns,
+                        rows=mark["rows"] + new_rows)
+        self.sources[key] = mark
+        return new_rows
+
+    def rebuild(self, extra=None, hold_partial=False):
+        """Drop every aggregate and ingest all known sources (plus extra) from the start."""
+        paths = [p for p in self.sources if os.path.exists(p)]
+        if extra is not None and os.path.abspath(extra) not in paths:
+            paths.append(os.path.abspath(extra))
+        self.dtypes, self.states, self.sources = {}, {}, {}
+        return sum(self.ingest(p, hold_partial) for p in paths)
+
+    def update(self, df):
+        """Merge the per-state aggregates of one frame of new rows."""
+        df = df[df[STATE].notna()]
+        if df.empty:
+            return
+        for col in self.columns:
+            dtype = df[col].dtype if col not in self.dtypes else np.result_type(self.dtypes[col], df[col].dtype)
+            self.dtypes[col] = str(dtype)
+        dates = pd.to_datetime(df[UPDATED_ON], format=DATE_FORMAT, errors="coerce")
+        grouped = df.groupby(STATE, sort=False)
+        rows, maxima = grouped.size(), grouped[self.columns].max()
+        # the latest non-missing value of each column, with its date
+        dated = df.assign(date=dates.dt.strftime("%Y-%m-%d"))[dates.notna()]
+        dated = dated.iloc[np.argsort(dates[dates.notna()].to_numpy(), kind="stable")]
+        latest = {col: dated[dated[col].notna()].groupby(STATE, sort=False)[["date", col]].last()
+                  for col in self.columns}
+        reported = dated[dated[self.columns].notna().any(axis=1)].groupby(STATE, sort=False)["date"].max()
+
+        for state in rows.index:
+            rec = self.states.setdefault(state, {"rows": 0, "last_updated": None,
+                                                 "max": dict.fromkeys(self.columns),
+                                                 "latest": dict.fromkeys(self.columns)})
+            rec["rows"] += int(rows[state])
+            if state in reported.index and (rec["last_updated"] is None or reported[state] > rec["last_updated"]):
+                rec["last_updated"] = reported[state]
+            for col in self.columns:
+                new_max = json_value(maxima.at[state, col], self.dtypes[col])
+                if new_max is not None and (rec["max"][col] is None or new_max > rec["max"][col]):
+                    rec["max"][col] = new_max
+                if state in latest[col].index:
+                    date, value = latest[col].loc[state]
+                    if rec["latest"][col] is None or date >= rec["latest"][col][0]:
+                        rec["latest"][col] = [date, json_value(value, self.dtypes[col])]
+
+    def table(self, field, columns=None):
+        """One column per tracked column, one row per state (sorted), from the stored field."""
+        columns = self.columns if columns is None else list(columns)
+        missing = [c for c in columns if c not in self.columns]
+        if missing:
+            raise KeyError(f"{missing} are not tracked by this store")
+        states = sorted(self.states)
+        out = pd.DataFrame(index=pd.Index(states, name=STATE))
+        for col in columns:
+            if field == "max":
+                values = [self.states[s]["max"][col] for s in states]
+            else:
+                values = [None if self.states[s]["latest"][col] is None else self.states[s]["latest"][col][1]
+                          for s in states]
+            dtype = np.dtype(self.dtypes.get(col, "float64"))
+            if dtype.kind in "iu" and None in values:
+                dtype = np.float64
+            out[col] = np.array([np.nan if v is None else v for v in values], dtype=dtype)
+        return out
+
+    def maxima(self, columns=None):
+        """Per-state maxima - the same table as statewise_maxima() over every ingested row."""
+        return self.table("max", columns)
+
+    def totals(self, columns=None):
+        """Per-state latest reported cumulative counts, with a "Last Updated" column."""
+        out = self.table("latest", columns)
+        out["Last Updated"] = pd.to_datetime([self.states[s]["last_updated"] for s in out.index])
+        return out
+
+def update_store(csv_paths=(VACCINE_CSV,), store_path=STORE_PATH, columns=COUNT_COLUMNS):
+    """Load the store, ingest whatever was appended to the sources, and save it."""
+    store = StateStore.load(store_path, columns)
+    for path in csv_paths:
+        store.ingest(path)
+    return store.save(store_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="State-wise maxima of the Covid vaccination counts")
+    parser.add_argument("csv", nargs="*", default=[VACCINE_CSV])
+    parser.add_argument("--store", default=None,
+                        help="keep aggregates in this file and only read rows appended since the last run")
+    args = parser.parse_args()
+    if args.store is None:
+        maxima = statewise_maxima(args.csv[0]) if len(args.csv) == 1 else \
+            state_maxima(pd.concat([load_statewise(p) for p in args.csv], ignore_index=True))
+    else:
+        maxima = update_store(args.csv, args.store).maxima()
+    for column in COUNT_COLUMNS:
+        print(f"\n{column}:\n")
+        print(ranked(maxima, column))
+
+if __name__ == "__main__":
+    main()
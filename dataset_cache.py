@@ -0,0 +1,136 @@
+# dataset_cache.py
+# Typed columnar cache for the CSVs the practicals load (Titanic.csv, House Data.csv,
+# Covid Vaccine Statewise.csv, IRIS.csv, Lung Cancer.csv, Telecom Churn.csv).
+#
+# The first load_csv() of a file parses it with pd.read_csv and stores every column
+# under CACHE_DIR as a .npy file: numeric / boolean columns as their values, text
+# columns as int32 codes into a table of distinct values. Later loads skip the
+# parse: requested columns are memory-mapped and nothing else is read, and the
+# result has the same values and dtypes as pd.read_csv would give.
+# A cache entry is valid while the CSV's size and mtime are unchanged; if only the
+# mtime changed, a SHA-256 of the contents decides (and the entry is re-stamped).
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from model_store import HASH_CHUNK
+
+CACHE_DIR = ".dataset_cache"
+CACHE_VERSION = 1
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def entry_dir(path, read_kwargs, cache_dir=CACHE_DIR):
+    """Cache directory for (absolute CSV path, read_csv options)."""
+    key = json.dumps([os.path.abspath(path), read_kwargs, CACHE_VERSION], sort_keys=True, default=str)
+    stem = re.sub(r"[^\w.-]+", "_", os.path.splitext(os.path.basename(path.replace("\\", "/")))[0])
+    return os.path.join(cache_dir, f"{stem}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}")
+
+def read_meta(entry):
+    try:
+        with open(os.path.join(entry, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_meta(entry, meta):
+    tmp = os.path.join(entry, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, os.path.join(entry, "meta.json"))
+
+def is_fresh(entry, meta, path):
+    """True if the entry still matches the CSV (size + mtime, falling back to the content hash)."""
+    if meta is None:
+        return False
+    st = os.stat(path)
+    if meta["size"] != st.st_size:
+        return False
+    if meta["mtime_ns"] == st.st_mtime_ns:
+        return True
+    if meta["sha256"] != file_sha256(path):
+        return False
+    meta["mtime_ns"] = st.st_mtime_ns   # touched but unchanged: keep the entry
+    write_meta(entry, meta)
+    return True
+
+def build_entry(path, entry, read_kwargs):
+    """Parse the CSV once and write the columnar entry atomically; returns the parsed frame."""
+    df = pd.read_csv(path, **read_kwargs)
+    st = os.stat(path)
+    os.makedirs(os.path.dirname(entry) or ".", exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(entry) or ".", suffix=".tmp")
+    try:
+        columns = []
+        for i, col in enumerate(df.columns):
+            s = df[col]
+            if isinstance(s.dtype, np.dtype) and s.dtype.kind in "biuf":
+                np.save(os.path.join(tmp, f"c{i}.npy"), s.to_numpy())
+                columns.append({"name": col, "kind": "values", "dtype": str(s.dtype)})
+            else:
+                codes, levels = pd.factorize(s, use_na_sentinel=True)
+                np.save(os.path.join(tmp, f"c{i}.npy"), codes.astype(np.int32))
+                with open(os.path.join(tmp, f"c{i}.levels.pkl"), "wb") as f:
+                    pickle.dump(np.asarray(levels, dtype=object), f, protocol=pickle.HIGHEST_PROTOCOL)
+                columns.append({"name": col, "kind": "codes", "dtype": str(s.dtype)})
+        meta = {"source": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                "sha256": file_sha256(path), "n_rows": len(df), "columns": columns}
+        write_meta(tmp, meta)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return df
+
+def load_column(entry, i, spec, n_rows):
+    """One cached column as a Series-ready array (memory-mapped for numeric columns)."""
+    values = np.load(os.path.join(entry, f"c{i}.npy"), mmap_mode="r")
+    if spec["kind"] == "values":
+        return values
+    with open(os.path.join(entry, f"c{i}.levels.pkl"), "rb") as f:
+        levels = pickle.load(f)
+    out = np.empty(n_rows, dtype=object)
+    present = values >= 0
+    out[present] = levels[values[present]]
+    out[~present] = np.nan
+    if spec["dtype"] != "object":
+        return pd.array(out, dtype=spec["dtype"])
+    return out
+
+def load_csv(path, columns=None, cache_dir=CACHE_DIR, **read_kwargs):
+    """
+    pd.read_csv(path, **read_kwargs)[columns] through the columnar cache.
+    columns=None loads every column. Only plain reads are cached: with index_col
+    the file is parsed directly.
+    """
+    if "index_col" in read_kwargs or "chunksize" in read_kwargs or "iterator" in read_kwargs:
+        df = pd.read_csv(path, **read_kwargs)
+        return df if columns is None else df[columns]
+    entry = entry_dir(path, read_kwargs, cache_dir)
+    meta = read_meta(entry)
+    if not is_fresh(entry, meta, path):
+        df = build_entry(path, entry, read_kwargs)
+        return df if columns is None else df[columns]
+
+    specs = {spec["name"]: (i, spec) for i, spec in enumerate(meta["columns"])}
+    wanted = [spec["name"] for spec in meta["columns"]] if columns is None else list(columns)
+    missing = [c for c in wanted if c not in specs]
+    if missing:
+        raise KeyError(f"{missing} not in columns of {path}")
+    data = {c: load_column(entry, specs[c][0], specs[c][1], meta["n_rows"]) for c in wanted}
+    return pd.DataFrame(data, columns=wanted, index=pd.RangeIndex(meta["n_rows"]))
@@ -0,0 +1,237 @@
+# hierarchical_engine.py
+# Agglomerative (hierarchical) clustering for the point sets of Practical9 /
+# Practical10 and larger ones.
+#
+# Pairwise distances are stored once as a condensed float32 vector (the upper
+# triangle, n(n-1)/2 entries - about 1.8 GB at n = 30000) built a block of rows at
+# a time, and linkage uses the nearest-neighbour chain algorithm: O(n^2) time, with
+# cluster distances updated in place by the Lance-Williams formulas instead of
+# being recomputed from the points.
+#
+# Usage:
+#    python hierarchical_engine.py --points practical10 --method ward --k 3
+#    python hierarchical_engine.py --points random --n 20000 --method average --k 5
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from kmeans_engine import MEMORY_BUDGET, METRICS, metric_distance_chunks, named_points
+
+METHODS = ("single", "complete", "average", "ward")
+
+# ---------------------------
+# Condensed distance matrix
+# ---------------------------
+def condensed_index(n, i, j):
+    """Position of pair (i, j), i < j (scalars or arrays), in the condensed vector."""
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+def condensed_distances(X, metric="euclidean", memory_budget=MEMORY_BUDGET):
+    """
+    Upper-triangle pairwise distances as float32, same layout as scipy's pdist.
+    Each block of rows is compared only with itself and the rows after it.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    n = X.shape[0]
+    out = np.empty(n * (n - 1) // 2, dtype=np.float32)
+    start = 0
+    while start < n - 1:
+        width = n - start
+        stop = min(n - 1, start + max(1, int(memory_budget // (width * 8))))
+        for lo, hi, block in metric_distance_chunks(X[start:stop], X[start:], metric, memory_budget):
+            for r in range(lo, hi):
+                i = start + r
+                pos = condensed_index(n, i, i + 1)
+                out[pos:pos + n - i - 1] = block[r - lo, r + 1:]
+        start = stop
+    return out
+
+def distance_row(D, n, i, others):
+    """Distances from i to every index in `others` (an int array not containing i)."""
+    lo, hi = np.minimum(others, i), np.maximum(others, i)
+    return D[condensed_index(n, lo, hi)]
+
+# ---------------------------
+# Nearest-neighbour chain linkage
+# ---------------------------
+def lance_williams(method, d_a, d_b, d_ab, n_a, n_b, n_k):
+    """Distance from the merge of a and b to clusters k, from their distances to a and b."""
+    if method == "single":
+        return np.minimum(d_a, d_b)
+    if method == "complete":
+        return np.maximum(d_a, d_b)
+    if method == "average":
+        return (n_a * d_a + n_b * d_b) / (n_a + n_b)
+    if method == "ward":
+        total = n_a + n_b + n_k
+        return np.sqrt(np.maximum(((n_a + n_k) * d_a * d_a + (n_b + n_k) * d_b * d_b
+                                   - n_k * d_ab * d_ab) / total, 0.0))
+    raise ValueError(f"Unknown linkage method '{method}', expected one of {METHODS}")
+
+def nn_chain_linkage(D, n, method="average"):
+    """
+    Agglomerative clustering of n points from their condensed distances D (modified
+    in place - pass a copy to keep it). Follows nearest neighbours until two clusters
+    are each other's nearest, merges them, and continues from the rest of the chain.
+    Returns a scipy-style linkage matrix: rows (cluster a, cluster b, distance, size)
+    in merge order, where ids >= n refer to the cluster formed in row id - n.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown linkage method '{method}', expected one of {METHODS}")
+    size = np.ones(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    merges = []
+    chain = []
+    for _ in range(n - 1):
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        while True:
+            a = chain[-1]
+            others = np.flatnonzero(active)
+            others = others[others != a]
+            row = distance_row(D, n, a, others)
+            b = int(others[np.argmin(row)])
+            d_ab = float(row.min())
+            # prefer the previous chain element on ties, or the chain could cycle
+            if len(chain) > 1 and float(distance_row(D, n, a, np.array([chain[-2]]))[0]) <= d_ab:
+                b = chain[-2]
+            if len(chain) > 1 and b == chain[-2]:
+                break
+            chain.append(b)
+        chain.pop()
+        chain.pop()
+        a, b = min(a, b), max(a, b)
+        d_ab = float(D[condensed_index(n, a, b)])
+        merges.append((a, b, d_ab, size[a] + size[b]))
+
+        # the merged cluster lives in slot a; b is retired
+        active[b] = False
+        rest = np.flatnonzero(active)
+        rest = rest[rest != a]
+        if rest.size:
+            new = lance_williams(method, distance_row(D, n, a, rest).astype(np.float64),
+                                 distance_row(D, n, b, rest).astype(np.float64), d_ab,
+                                 size[a], size[b], size[rest])
+            D[condensed_index(n, np.minimum(rest, a), np.maximum(rest, a))] = new
+        size[a] += size[b]
+    return relabel_merges(merges, n)
+
+def relabel_merges(merges, n):
+    """Sort merges by distance and give every formed cluster a scipy-style id (n + row)."""
+    order = sorted(range(len(merges)), key=lambda m: merges[m][2])
+    parent = list(range(n))
+    cluster_id = list(range(n))   # current id of the cluster whose root is this slot
+    def root(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    Z = np.empty((len(merges), 4))
+    for row, m in enumerate(order):
+        a, b, d, s = merges[m]
+        ra, rb = root(a), root(b)
+        ia, ib = sorted((cluster_id[ra], cluster_id[rb]))
+        Z[row] = (ia, ib, d, s)
+        parent[rb] = ra
+        cluster_id[ra] = n + row
+    return Z
+
+def linkage(X, method="average", metric="euclidean", memory_budget=MEMORY_BUDGET):
+    """Condensed distances + NN-chain linkage for the rows of X (ward needs euclidean)."""
+    if method == "ward" and metric != "euclidean":
+        raise ValueError("ward linkage needs the euclidean metric")
+    X = np.asarray(X, dtype=np.float64)
+    return nn_chain_linkage(condensed_distances(X, metric, memory_budget), X.shape[0], method)
+
+# ---------------------------
+# Flat cuts and dendrogram
+# ---------------------------
+def cut_tree(Z, n_clusters=None, height=None):
+    """
+    Flat clusters from a linkage matrix: either exactly n_clusters, or every merge
+    at distance <= height. Labels are 0.. in order of each cluster's first point.
+    """
+    n = len(Z) + 1
+    if (n_clusters is None) == (height is None):
+        raise ValueError("give exactly one of n_clusters or height")
+    n_merges = n - n_clusters if n_clusters is not None else int(np.searchsorted(Z[:, 2], height, side="right"))
+    parent = np.arange(2 * n - 1)
+    for row in range(max(0, min(n_merges, n - 1))):
+        parent[int(Z[row, 0])] = parent[int(Z[row, 1])] = n + row
+    roots = np.arange(n)
+    while True:
+        up = parent[roots]
+        if np.array_equal(up, roots):
+            break
+        roots = up
+    _, first, labels = np.unique(roots, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[np.argsort(first)] = np.arange(len(first))
+    return rank[labels]
+
+def print_dendrogram(Z, names, indent=""):
+    """Text dendrogram: every merge with its height, leaves by name (top merge first)."""
+    n = len(names)
+    def show(node, indent):
+        if node < n:
+            print(indent + "-> " + str(names[node]))
+            return
+        a, b, d, s = Z[node - n]
+        print(indent + f"[merge at {d:.6f}, size {int(s)}]")
+        show(int(a), indent + "  ")
+        show(int(b), indent + "  ")
+    if n == 1:
+        print(indent + "-> " + str(names[0]))
+    else:
+        show(2 * n - 2, indent)
+
+# ---------------------------
+# Demo
+# ---------------------------
+def practical_points(module):
+    """The `points` dict of Practical9 / Practical10 (imported quietly - they are scripts)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        mod = __import__(module)
+    return mod.points
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agglomerative clustering (NN-chain linkage)")
+    parser.add_argument("--points", choices=("practical9", "practical10", "random"), default="practical10")
+    parser.add_argument("--n", type=int, default=10000, help="number of random points")
+    parser.add_argument("--dims", type=int, default=2, help="dimension of random points")
+    parser.add_argument("--method", choices=METHODS, default="average")
+    parser.add_argument("--metric", choices=METRICS, default="euclidean")
+    parser.add_argument("--k", type=int, default=2, help="number of flat clusters to cut")
+    args = parser.parse_args(argv)
+
+    if args.points == "random":
+        rs = np.random.RandomState(0)
+        points = {f"p{i + 1}": tuple(row) for i, row in enumerate(rs.rand(args.n, args.dims))}
+    else:
+        points = practical_points("Practical9" if args.points == "practical9" else "Practical10")
+    names, _, X = named_points(points)
+
+    start = time.perf_counter()
+    D = condensed_distances(X, args.metric)
+    built = time.perf_counter()
+    Z = nn_chain_linkage(D, len(names), args.method)
+    linked = time.perf_counter()
+    print(f"{len(names)} points: distances {built - start:.3f}s ({D.nbytes / 2**20:.1f} MB float32), "
+          f"{args.method} linkage {linked - built:.3f}s")
+
+    if len(names) <= 50:
+        print("\nDendrogram:")
+        print_dendrogram(Z, names, "  ")
+    labels = cut_tree(Z, n_clusters=args.k)
+    print(f"\nFlat cut into {args.k} clusters:")
+    for c in range(args.k):
+        members = [names[i] for i in np.flatnonzero(labels == c)]
+        shown = members if len(members) <= 20 else members[:20] + ["..."]
+        print(f"  Cluster {c + 1} ({len(members)} points): {shown}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# histogram_pipeline.py
+# Headless histogram images for every numeric column (Practical3).
+#
+# The bin counts of all columns are computed up front with np.histogram (the same
+# bins plt.hist would pick), and only the finished counts are sent to a process
+# pool that draws them on the non-interactive Agg backend. A manifest in the
+# output directory records a hash of each column's data and bin settings, so
+# columns that have not changed since the last run are not redrawn.
+# File names are made safe for every OS: "Unnamed: 0" used to produce a broken
+# "hist_Unnamed" file on Windows (':' starts an NTFS stream name).
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MANIFEST = ".hist_manifest.json"
+UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]+')   # illegal in Windows file names, plus control chars
+
+def safe_filename(column, used, prefix="hist_", suffix=".png"):
+    """File name for a column: unsafe characters -> "_", blank -> "column", unique within `used`."""
+    stem = UNSAFE_CHARS.sub("_", str(column)).strip("._ ") or "column"
+    name = f"{prefix}{stem}{suffix}"
+    n = 2
+    while name.lower() in used:
+        name = f"{prefix}{stem}_{n}{suffix}"
+        n += 1
+    used.add(name.lower())
+    return name
+
+def column_histogram(values, bins=30):
+    """(counts, edges) of the non-NaN values - what plt.hist(values.dropna(), bins) would draw."""
+    values = np.asarray(values, dtype=np.float64)
+    return np.histogram(values[~np.isnan(values)], bins=bins)
+
+def data_hash(column, values, bins):
+    h = hashlib.sha256()
+    h.update(json.dumps([str(column), bins]).encode("utf-8"))
+    h.update(np.ascontiguousarray(values).tobytes())
+    return h.hexdigest()
+
+def render_histogram(path, column, counts, edges):
+    """Worker task: draw precomputed counts (same bars as plt.hist) and save the figure."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(6, 4))
+    plt.hist(edges[:-1], bins=edges, weights=counts)
+    plt.title(f"Histogram of {column}")
+    plt.xlabel(column)
+    plt.ylabel("Frequency")
+    plt.grid(False)
+    plt.savefig(path)
+    plt.close()
+    return path
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def render_histograms(numeric_df, out_dir=".", bins=30, workers=None, force=False):
+    """
+    Write one histogram image per column of numeric_df into out_dir.
+    Returns [(column, file path, "rendered" | "unchanged")] in column order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {} if force else load_manifest(manifest_path)
+    used, jobs, report, new_manifest = set(), [], [], {}
+    for column in numeric_df.columns:
+        values = numeric_df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        path = os.path.join(out_dir, safe_filename(column, used))
+        key = data_hash(column, values, bins)
+        new_manifest[os.path.basename(path)] = key
+        if manifest.get(os.path.basename(path)) == key and os.path.exists(path):
+            report.append((column, path, "unchanged"))
+            continue
+        counts, edges = column_histogram(values, bins)
+        jobs.append((path, str(column), counts, edges))
+        report.append((column, path, "rendered"))
+
+    if workers is not None and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            list(pool.map(render_histogram, *zip(*jobs)))
+    else:
+        for job in jobs:
+            render_histogram(*job)
+
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(new_manifest, f, indent=1)
+    os.replace(tmp, manifest_path)
+    return report
@@ -0,0 +1,195 @@
+# hoeffding_tree.py
+# Incremental (Hoeffding / VFDT-style) version of the ID3 tree in Practical4.py.
+# Each leaf keeps only value x class counts per attribute - the same contingency
+# tables Practical4's entropy()/info_gain() work on - so memory depends on the size
+# of the tree, not on how many rows have streamed through it. A leaf splits once
+# the Hoeffding bound says its best attribute is reliably better than the runner-up.
+#
+# Attributes are treated as categorical; bin numeric fields before streaming them.
+#
+# Usage:
+#    python hoeffding_tree.py
+
+import csv
+import math
+from itertools import islice
+
+from Practical4 import CSV_FILE, entropy, info_gain, print_tree
+
+GRACE_PERIOD = 200    # rows a leaf must see between split attempts
+DELTA = 1e-7          # allowed probability of choosing the wrong split attribute
+TIE_THRESHOLD = 0.05  # split anyway when the bound gets this tight (near-ties)
+BATCH_SIZE = 1000     # rows per mini-batch when streaming a CSV
+
+def hoeffding_bound(value_range, delta, n):
+    """With probability 1 - delta the true mean is within this of the mean of n samples."""
+    return math.sqrt(value_range * value_range * math.log(1.0 / delta) / (2.0 * n))
+
+def new_leaf(attributes, depth):
+    # n / class_counts cover every row that reached the leaf (a split child inherits
+    # them for its majority class); n_stats counts only the rows behind its stats
+    # tables, and is the sample size the Hoeffding bound is computed from
+    return {"type": "leaf", "depth": depth, "attributes": attributes, "n": 0, "n_stats": 0,
+            "since_check": 0, "class_counts": {}, "stats": {a: {} for a in attributes}}
+
+class HoeffdingTree:
+    """
+    Streaming decision tree. Feed it with learn_batch()/learn() and read the
+    current tree (Practical4's nested-dict format) at any time with tree().
+    """
+    def __init__(self, attributes, target, grace_period=GRACE_PERIOD, delta=DELTA,
+                 tie_threshold=TIE_THRESHOLD, max_depth=None):
+        self.attributes = list(attributes)
+        self.target = target
+        self.grace_period = grace_period
+        self.delta = delta
+        self.tie_threshold = tie_threshold
+        self.max_depth = max_depth
+        self.classes = []
+        self.rows_seen = 0
+        self.root = new_leaf(self.attributes, 0)
+
+    # ---------------------------
+    # Learning
+    # ---------------------------
+    def learn(self, batches):
+        """Consume an iterable/generator of mini-batches ({column: sequence of values})."""
+        for batch in batches:
+            self.learn_batch(batch)
+        return self
+
+    def learn_batch(self, batch):
+        """Update leaf statistics with one columnar mini-batch and try splits."""
+        columns = [batch[a] for a in self.attributes]
+        touched = {}
+        for i, cls in enumerate(batch[self.target]):
+            if cls not in self.classes:
+                self.classes.append(cls)
+            row = {a: col[i] for a, col in zip(self.attributes, columns)}
+            leaf = self.sort_to_leaf(row)
+            leaf["n"] += 1
+            leaf["n_stats"] += 1
+            leaf["since_check"] += 1
+            leaf["class_counts"][cls] = leaf["class_counts"].get(cls, 0) + 1
+            for a in leaf["attributes"]:
+                counts = leaf["stats"][a].setdefault(row[a], {})
+                counts[cls] = counts.get(cls, 0) + 1
+            touched[id(leaf)] = leaf
+        self.rows_seen += len(batch[self.target])
+
+        for leaf in touched.values():
+            if leaf["since_check"] >= self.grace_period:
+                leaf["since_check"] = 0
+                self.try_split(leaf)
+
+    def sort_to_leaf(self, row):
+        node = self.root
+        while node["type"] == "node":
+            val = row[node["attribute"]]
+            child = node["children"].get(val)
+            if child is None:
+                # value first seen below this split: grow a fresh leaf for it
+                child = node["children"][val] = new_leaf(node["child_attributes"], node["depth"] + 1)
+            node = child
+        return node
+
+    def table(self, leaf, attr):
+        """Leaf statistics for attr as Practical4's {value: [count per class]} table."""
+        return {v: [counts.get(c, 0) for c in self.classes] for v, counts in leaf["stats"][attr].items()}
+
+    def try_split(self, leaf):
+        if len(leaf["class_counts"]) < 2 or not leaf["attributes"]:
+            return
+        if self.max_depth is not None and leaf["depth"] >= self.max_depth:
+            return
+        gains = sorted(((info_gain(self.table(leaf, a)), a) for a in leaf["attributes"]), reverse=True)
+        best_gain, best_attr = gains[0]
+        second_gain = gains[1][0] if len(gains) > 1 else 0.0
+        eps = hoeffding_bound(math.log2(max(len(self.classes), 2)), self.delta, leaf["n_stats"])
+        # the best attribute must beat not splitting at all, and the runner-up unless it is a tie
+        if best_gain > eps and (best_gain - second_gain > eps or eps < self.tie_threshold):
+            self.split(leaf, best_attr)
+
+    def split(self, leaf, attr):
+        """
+        Turn the leaf into an internal node in place. Children inherit the leaf's class
+        counts for their majority, but start with empty statistics (n_stats = 0).
+        """
+        child_attrs = [a for a in leaf["attributes"] if a != attr]
+        children = {}
+        for val, counts in leaf["stats"][attr].items():
+            child = new_leaf(child_attrs, leaf["depth"] + 1)
+            child["class_counts"] = dict(counts)
+            child["n"] = sum(counts.values())
+            children[val] = child
+        majority = max(leaf["class_counts"], key=leaf["class_counts"].get)
+        depth = leaf["depth"]
+        leaf.clear()
+        leaf.update({"type": "node", "attribute": attr, "class": majority, "depth": depth,
+                     "child_attributes": child_attrs, "children": children})
+
+    # ---------------------------
+    # Reading the model
+    # ---------------------------
+    def tree(self):
+        """Snapshot of the current tree in Practical4's format (no statistics)."""
+        def export(node):
+            if node["type"] == "leaf":
+                counts = node["class_counts"]
+                return {"type": "leaf", "class": max(counts, key=counts.get) if counts else None}
+            return {"type": "node", "attribute": node["attribute"], "class": node["class"],
+                    "children": {v: export(c) for v, c in node["children"].items()}}
+        return export(self.root)
+
+    def n_leaves(self):
+        def count(node):
+            if node["type"] == "leaf":
+                return 1
+            return sum(count(c) for c in node["children"].values())
+        return count(self.root)
+
+    def leaf_entropy(self):
+        """Row-weighted entropy of the leaves' class counts (lower = purer tree)."""
+        leaves, stack = [], [self.root]
+        while stack:
+            node = stack.pop()
+            if node["type"] == "leaf":
+                leaves.append(node)
+            else:
+                stack.extend(node["children"].values())
+        total = sum(l["n"] for l in leaves)
+        return sum(l["n"] / total * entropy(list(l["class_counts"].values())) for l in leaves if l["n"])
+
+def csv_batches(path, batch_size=BATCH_SIZE):
+    """Stream a CSV as columnar mini-batches {column: [values]} of batch_size rows."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        while True:
+            rows = list(islice(reader, batch_size))
+            if not rows:
+                return
+            yield {col: [row[j].strip() if j < len(row) else "" for row in rows] for j, col in enumerate(header)}
+
+# ---------------------------
+# Main
+# ---------------------------
+def main():
+    with open(CSV_FILE, newline='', encoding='utf-8') as f:
+        header = [h.strip() for h in next(csv.reader(f))]
+    target = header[-1]
+    attributes = [c for c in header if c != target]
+    print("Streaming", CSV_FILE, "in batches of", BATCH_SIZE)
+    print("Using target column:", target)
+
+    model = HoeffdingTree(attributes, target)
+    for batch in csv_batches(CSV_FILE):
+        model.learn_batch(batch)
+        print(f"  seen {model.rows_seen} rows, {model.n_leaves()} leaves, "
+              f"leaf entropy = {model.leaf_entropy():.6f}")
+
+    print("\nCurrent tree:\n")
+    print_tree(model.tree())
+
+if __name__ == "__main__":
+    main()
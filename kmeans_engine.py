@@ -0,0 +1,808 @@
+# kmeans_engine.py
+# Shared k-means building blocks for the clustering practicals.
+#
+# The assignment step uses the expansion ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2,
+# so the distance work is one matrix product per chunk (BLAS) instead of an
+# n x k x d broadcast temporary. Rows are processed in chunks sized to a memory
+# budget, keeping peak memory at O(n + k*d) plus one chunk's distance block.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # brute force only
+    cKDTree = None
+
+MEMORY_BUDGET = 64 * 2**20   # bytes allowed for one chunk's temporaries
+KDTREE_MAX_FEATURES = 4      # "auto" uses the centroid kd-tree up to this many features ...
+KDTREE_MIN_CLUSTERS = 128    # ... and from this many clusters (crossover from bench_kmeans.py)
+
+def row_norms(X):
+    """Squared Euclidean norm of every row."""
+    return np.einsum("ij,ij->i", X, X)
+
+def chunk_rows(n_clusters, n_features, itemsize, memory_budget=MEMORY_BUDGET):
+    """Rows per chunk so that the chunk copy plus its chunk x k distance block fit the budget."""
+    return max(1, int(memory_budget // ((n_clusters + n_features) * itemsize)))
+
+def sq_distance_chunks(X, centroids, dtype=np.float64, memory_budget=MEMORY_BUDGET, x_norms=None):
+    """Yield (start, stop, squared distances of rows start:stop to every centroid)."""
+    n_samples = X.shape[0]
+    C = np.ascontiguousarray(centroids, dtype=dtype)
+    c_norms = row_norms(C)
+    step = chunk_rows(len(C), C.shape[1], np.dtype(dtype).itemsize, memory_budget)
+    for start in range(0, n_samples, step):
+        stop = min(start + step, n_samples)
+        Xc = np.asarray(X[start:stop], dtype=dtype)
+        dist = Xc @ C.T                 # BLAS: chunk x k
+        dist *= -2.0
+        dist += c_norms
+        dist += (row_norms(Xc) if x_norms is None else x_norms[start:stop])[:, None]
+        np.maximum(dist, 0.0, out=dist)  # clip tiny negatives from cancellation
+        yield start, stop, dist
+
+def tie_tolerance(min_sq, c_max, n_features, dtype):
+    """
+    Slack within which two squared distances count as tied: a generous bound on the
+    rounding error of the GEMM form, using ||x||^2 + ||c||^2 <= 2 min_sq + 3 max ||c||^2.
+    """
+    return 64 * n_features * np.finfo(dtype).eps * (2.0 * min_sq + 3.0 * c_max)
+
+def resolve_ties(X, centroids, memory_budget=MEMORY_BUDGET):
+    """
+    Nearest and second-nearest centroid of a few rows from direct differences, exact
+    ties going to the lower index. Unlike GEMM the result does not depend on chunk
+    shape or BLAS kernel, so every backend agrees on near-tied rows.
+    Returns (labels, first, second) as squared distances.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    C = np.asarray(centroids, dtype=np.float64)
+    n_rows, n_clusters = X.shape[0], len(C)
+    labels = np.empty(n_rows, dtype=np.intp)
+    first = np.empty(n_rows)
+    second = np.full(n_rows, np.inf)
+    step = max(1, int(memory_budget // (n_clusters * C.shape[1] * 8)))
+    for start in range(0, n_rows, step):
+        stop = min(start + step, n_rows)
+        diff = X[start:stop, None, :] - C[None, :, :]
+        sq = (diff * diff).sum(axis=2)
+        rows = np.arange(stop - start)
+        lab = np.argmin(sq, axis=1)
+        labels[start:stop], first[start:stop] = lab, sq[rows, lab]
+        if n_clusters > 1:
+            sq[rows, lab] = np.inf
+            second[start:stop] = sq.min(axis=1)
+    return labels, first, second
+
+def brute_chunks(X, centroids, dtype=np.float64, memory_budget=MEMORY_BUDGET, x_norms=None, second=False):
+    """
+    Yield (start, stop, labels, squared distance to the nearest centroid, squared distance
+    to the second-nearest or None) per GEMM chunk. Rows whose nearest centroid is within
+    tie_tolerance of another one are settled by resolve_ties.
+    """
+    C = np.asarray(centroids, dtype=dtype)
+    c_max = float(row_norms(C).max())
+    for start, stop, dist in sq_distance_chunks(X, C, dtype, memory_budget, x_norms):
+        rows = np.arange(stop - start)
+        lab = np.argmin(dist, axis=1)
+        first = dist[rows, lab]
+        tied = np.flatnonzero(np.count_nonzero(
+            dist <= (first + tie_tolerance(first, c_max, C.shape[1], dtype))[:, None], axis=1) > 1)
+        nxt = None
+        if second:
+            dist[rows, lab] = np.inf
+            nxt = dist.min(axis=1)
+        if tied.size:
+            tie_lab, tie_first, tie_second = resolve_ties(X[start + tied], centroids, memory_budget)
+            lab[tied], first[tied] = tie_lab, tie_first
+            if second:
+                nxt[tied] = tie_second
+        yield start, stop, lab, first, nxt
+
+def use_kdtree(n_clusters, n_features, backend="auto"):
+    """Whether the assignment backend ("auto", "brute" or "kdtree") resolves to the kd-tree."""
+    if backend == "brute":
+        return False
+    if backend == "kdtree":
+        if cKDTree is None:
+            raise ImportError("backend='kdtree' needs scipy")
+        return True
+    if backend != "auto":
+        raise ValueError(f"Unknown assignment backend '{backend}', expected 'auto', 'brute' or 'kdtree'")
+    return cKDTree is not None and n_features <= KDTREE_MAX_FEATURES and n_clusters >= KDTREE_MIN_CLUSTERS
+
+def kdtree_two_nearest(X, centroids, dtype=np.float64, memory_budget=MEMORY_BUDGET):
+    """
+    two_nearest() through a kd-tree over the centroids: O(n log k) for small d instead
+    of O(n k). Rows whose two nearest centroids are within tie_tolerance go through
+    resolve_ties like in brute force, so the labels match it exactly.
+    """
+    n_samples = X.shape[0]
+    C = np.asarray(centroids, dtype=np.float64)
+    if len(C) < 2:
+        return two_nearest(X, centroids, dtype, memory_budget, backend="brute")
+    labels = np.empty(n_samples, dtype=np.intp)
+    first = np.empty(n_samples, dtype=dtype)
+    second = np.empty(n_samples, dtype=dtype)
+    tree = cKDTree(C)
+    c_max = float(row_norms(C).max())
+    step = chunk_rows(2, C.shape[1], 8, memory_budget)
+    for start in range(0, n_samples, step):
+        stop = min(start + step, n_samples)
+        dist, idx = tree.query(np.asarray(X[start:stop], dtype=np.float64), k=2)
+        labels[start:stop] = idx[:, 0]
+        first[start:stop] = dist[:, 0]
+        second[start:stop] = dist[:, 1]
+        m = dist[:, 0] ** 2
+        tied = np.flatnonzero(dist[:, 1] ** 2 - m <= tie_tolerance(m, c_max, C.shape[1], dtype))
+        if tied.size:
+            rows = start + tied
+            tie_lab, tie_first, tie_second = resolve_ties(X[rows], C, memory_budget)
+            labels[rows], first[rows], second[rows] = tie_lab, np.sqrt(tie_first), np.sqrt(tie_second)
+    return labels, first, second
+
+def assign_labels(X, centroids, dtype=np.float64, memory_budget=MEMORY_BUDGET, x_norms=None,
+                  backend="auto"):
+    """
+    Nearest centroid for every row of X.
+    - dtype: np.float32 halves memory traffic and uses single-precision GEMM
+    - x_norms: precomputed row_norms(X) (in dtype) to reuse across iterations
+    - backend: "brute" (chunked GEMM), "kdtree" (scipy kd-tree over the centroids) or
+      "auto" (kd-tree when use_kdtree() says so); both give the same labels
+    Returns (labels, squared distance to the assigned centroid).
+    """
+    if use_kdtree(len(centroids), X.shape[1], backend):
+        labels, first, _ = kdtree_two_nearest(X, centroids, dtype, memory_budget)
+        return labels, first * first
+    labels = np.empty(X.shape[0], dtype=np.intp)
+    min_sq = np.empty(X.shape[0], dtype=dtype)
+    for start, stop, lab, first, _ in brute_chunks(X, centroids, dtype, memory_budget, x_norms):
+        labels[start:stop] = lab
+        min_sq[start:stop] = first
+    return labels, min_sq
+
+def two_nearest(X, centroids, dtype=np.float64, memory_budget=MEMORY_BUDGET, backend="auto"):
+    """Labels plus (Euclidean) distances to the nearest and second-nearest centroid."""
+    if use_kdtree(len(centroids), X.shape[1], backend):
+        return kdtree_two_nearest(X, centroids, dtype, memory_budget)
+    n_samples = X.shape[0]
+    labels = np.empty(n_samples, dtype=np.intp)
+    first = np.empty(n_samples, dtype=dtype)
+    second = np.full(n_samples, np.inf, dtype=dtype)
+    for start, stop, lab, d1, d2 in brute_chunks(X, centroids, dtype, memory_budget, second=len(centroids) > 1):
+        labels[start:stop] = lab
+        first[start:stop] = d1
+        if d2 is not None:
+            second[start:stop] = d2
+    return labels, np.sqrt(first), np.sqrt(second)
+
+def cluster_sums(X, labels, n_clusters):
+    """Per-cluster (sum of rows, row count): one weighted bincount per feature, no per-cluster rescans."""
+    counts = np.bincount(labels, minlength=n_clusters)
+    sums = np.empty((n_clusters, X.shape[1]))
+    for j in range(X.shape[1]):
+        sums[:, j] = np.bincount(labels, weights=X[:, j], minlength=n_clusters)
+    return sums, counts
+
+def means_from_sums(X, sums, counts, centroids, random_state=None):
+    """
+    Cluster means from (possibly reduced) sums and counts, in the centroids' dtype.
+    Empty clusters are re-seeded at a random data point.
+    Returns (new centroids, list of re-seeded cluster indices).
+    """
+    rs = np.random if random_state is None else random_state
+    new = np.empty_like(centroids)
+    nonempty = counts > 0
+    new[nonempty] = sums[nonempty] / counts[nonempty, None]
+    empty = np.flatnonzero(~nonempty).tolist()
+    for c in empty:
+        new[c] = X[rs.choice(X.shape[0], 1)[0]]
+    return new, empty
+
+def update_centroids(X, labels, centroids, random_state=None):
+    """
+    Mean of each cluster's members (one weighted bincount per feature).
+    Empty clusters are re-seeded at a random data point.
+    Returns (new centroids, list of re-seeded cluster indices).
+    """
+    sums, counts = cluster_sums(X, labels, len(centroids))
+    return means_from_sums(X, sums, counts, centroids, random_state)
+
+def inertia(X, centroids, labels):
+    """Sum of squared distances of every row to its assigned centroid."""
+    diff = X - centroids[labels]
+    return float(np.einsum("ij,ij->", diff, diff))
+
+# ---------------------------
+# Seeding
+# ---------------------------
+def sq_distances_to(X, center, dtype=np.float64, x_norms=None):
+    """Squared distance of every row of X to one center (same expansion as the chunks)."""
+    c = np.asarray(center, dtype=dtype)
+    d = (row_norms(X) if x_norms is None else x_norms) - 2.0 * (X @ c) + c @ c
+    return np.maximum(d, 0.0)
+
+def kmeans_plusplus(X, n_clusters, random_state=None, sample_weight=None, n_local_trials=None,
+                    dtype=np.float64):
+    """
+    k-means++ seeding (Arthur & Vassilvitskii 2007): each new center is drawn with
+    probability proportional to (weight x) squared distance to the nearest chosen one.
+    Greedy variant: n_local_trials candidates per step (default 2 + log k), keeping
+    the one that lowers the potential most. Returns the seed centroids.
+    """
+    rs = np.random if random_state is None else random_state
+    X = np.asarray(X, dtype=dtype)
+    n_samples = X.shape[0]
+    w = np.ones(n_samples) if sample_weight is None else np.asarray(sample_weight, dtype=float)
+    if n_local_trials is None:
+        n_local_trials = 2 + int(np.log(n_clusters))
+    x_norms = row_norms(X)
+    centers = np.empty((n_clusters, X.shape[1]), dtype=dtype)
+    centers[0] = X[rs.choice(n_samples, p=w / w.sum())]
+    closest = sq_distances_to(X, centers[0], dtype, x_norms)
+    for c in range(1, n_clusters):
+        potential = w * closest
+        total = potential.sum()
+        if total <= 0:   # fewer distinct points than clusters
+            centers[c:] = centers[0]
+            break
+        cand = np.searchsorted(np.cumsum(potential), rs.random_sample(n_local_trials) * total)
+        cand = np.minimum(cand, n_samples - 1)
+        best = None
+        for i in cand:
+            trial = np.minimum(closest, sq_distances_to(X, X[i], dtype, x_norms))
+            trial_potential = w @ trial
+            if best is None or trial_potential < best[0]:
+                best = (trial_potential, i, trial)
+        _, i, closest = best
+        centers[c] = X[i]
+    return centers
+
+def kmeans_parallel_init(X, n_clusters, oversampling=None, n_rounds=5, random_state=None,
+                         dtype=np.float64):
+    """
+    k-means|| seeding (Bahmani et al. 2012): a few rounds that each sample about
+    `oversampling` (default 2k) points at once with probability ~ squared distance,
+    then k-means++ over the candidates weighted by how many points each one is
+    nearest to. Needs n_rounds passes over X instead of k.
+    """
+    rs = np.random if random_state is None else random_state
+    X = np.asarray(X, dtype=dtype)
+    n_samples = X.shape[0]
+    ell = 2 * n_clusters if oversampling is None else oversampling
+    x_norms = row_norms(X)
+    chosen = [rs.choice(n_samples)]
+    closest = sq_distances_to(X, X[chosen[0]], dtype, x_norms)
+    for _ in range(n_rounds):
+        total = closest.sum()
+        if total <= 0:
+            break
+        picked = np.flatnonzero(rs.random_sample(n_samples) < ell * closest / total)
+        if picked.size == 0:
+            continue
+        chosen.extend(picked.tolist())
+        _, d = assign_labels(X, X[picked], dtype, x_norms=x_norms)
+        np.minimum(closest, d, out=closest)
+    candidates = X[chosen]
+    if len(candidates) <= n_clusters:
+        return kmeans_plusplus(X, n_clusters, rs, dtype=dtype)
+    labels, _ = assign_labels(X, candidates, dtype, x_norms=x_norms)
+    weights = np.bincount(labels, minlength=len(candidates))
+    return kmeans_plusplus(candidates, n_clusters, rs, sample_weight=weights, dtype=dtype)
+
+INIT_METHODS = ("random", "k-means++", "k-means||")
+
+def init_centroids(X, n_clusters, method="k-means++", random_state=None, dtype=np.float64):
+    """Seed centroids with one of INIT_METHODS ("random" = k distinct data points)."""
+    rs = np.random if random_state is None else random_state
+    if method == "random":
+        return np.array(X[rs.choice(X.shape[0], size=n_clusters, replace=False)], dtype=dtype)
+    if method == "k-means++":
+        return kmeans_plusplus(X, n_clusters, rs, dtype=dtype)
+    if method == "k-means||":
+        return kmeans_parallel_init(X, n_clusters, random_state=rs, dtype=dtype)
+    raise ValueError(f"Unknown init method '{method}', expected one of {INIT_METHODS}")
+
+# ---------------------------
+# Accelerated k-means (Hamerly)
+# ---------------------------
+def kmeans_hamerly(X, centroids, max_iter=300, tol=1e-4, label_tol=0, random_state=None,
+                   dtype=np.float64, on_empty=None, backend="auto"):
+    """
+    Lloyd's k-means with Hamerly's bounds: each point keeps an upper bound on the
+    distance to its centroid and a lower bound on the distance to any other one.
+    A point is skipped when its upper bound is below max(lower bound, half the gap
+    from its centroid to the nearest other centroid) - its label provably can't change.
+    Stops once the largest centroid shift is <= tol and at most label_tol labels changed.
+    on_empty(iteration, cluster) is called when an empty cluster is re-seeded.
+    backend picks the two_nearest() implementation (see assign_labels).
+    Returns a dict with centroids, labels, n_iter, inertia, converged and the number of
+    distance evaluations done vs. skipped relative to plain Lloyd (n * k per pass).
+    """
+    X = np.asarray(X, dtype=dtype)
+    n_samples = X.shape[0]
+    C = np.array(centroids, dtype=dtype)
+    n_clusters = len(C)
+
+    labels, upper, lower = two_nearest(X, C, dtype, backend=backend)
+    evaluated = brute_force = n_samples * n_clusters
+    converged = False
+    it = 0
+    for it in range(1, max_iter + 1):
+        # update step, then move every bound by how far the centroids moved
+        new_C, empty = update_centroids(X, labels, C, random_state)
+        if on_empty is not None:
+            for c in empty:
+                on_empty(it, c)
+        shift = np.sqrt(row_norms(new_C - C))
+        C = new_C
+        upper += shift[labels]
+        if n_clusters > 1:
+            top = np.argsort(shift)[::-1][:2]
+            lower -= np.where(labels == top[0], shift[top[1]], shift[top[0]])
+
+        # half distance from each centroid to its nearest other centroid
+        cc = np.sqrt(np.maximum(row_norms(C)[:, None] - 2.0 * C @ C.T + row_norms(C)[None, :], 0.0))
+        np.fill_diagonal(cc, np.inf)
+        bound = np.maximum(0.5 * cc.min(axis=1)[labels], lower)
+
+        # tighten the upper bound only where the cheap test fails
+        cand = np.flatnonzero(upper > bound)
+        upper[cand] = np.sqrt(row_norms(X[cand] - C[labels[cand]]))
+        evaluated += cand.size
+        cand = cand[upper[cand] > bound[cand]]
+        changed = 0
+        if cand.size:
+            lab, first, second = two_nearest(X[cand], C, dtype, backend=backend)
+            changed = int(np.count_nonzero(lab != labels[cand]))
+            labels[cand], upper[cand], lower[cand] = lab, first, second
+        evaluated += cand.size * n_clusters
+        brute_force += n_samples * n_clusters
+
+        if shift.max() <= tol and changed <= label_tol:
+            converged = True
+            break
+
+    return {"centroids": C, "labels": labels, "n_iter": it, "converged": converged,
+            "inertia": inertia(X, C, labels), "distance_evals": evaluated,
+            "distance_evals_skipped": brute_force - evaluated}
+
+# ---------------------------
+# Threaded, sharded Lloyd steps
+# ---------------------------
+def shard_bounds(n_rows, n_shards):
+    """(start, stop) of n_shards near-equal contiguous row ranges."""
+    edges = np.linspace(0, n_rows, max(1, n_shards) + 1).astype(int)
+    return [(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+def shard_step(X, start, stop, centroids, dtype, memory_budget, x_norms, backend):
+    """Assign one row shard and return (labels, per-cluster sums, counts, inertia) for it."""
+    Xs = X[start:stop]
+    labels, min_sq = assign_labels(Xs, centroids, dtype, memory_budget,
+                                   None if x_norms is None else x_norms[start:stop], backend)
+    sums, counts = cluster_sums(Xs, labels, len(centroids))
+    return labels, sums, counts, float(min_sq.sum())
+
+def lloyd_step(X, centroids, dtype=np.float64, memory_budget=MEMORY_BUDGET, x_norms=None,
+               pool=None, n_shards=None, random_state=None, backend="auto"):
+    """
+    One Lloyd iteration (assign + mean update). With a thread pool, X is cut into
+    n_shards row shards (default: one per CPU); each thread assigns its shard and
+    accumulates partial sums / counts, which are reduced here into the new centroids.
+    The GEMM and argmin kernels release the GIL, so shards run on separate cores -
+    limit BLAS to one thread per call (e.g. OMP_NUM_THREADS=1) to avoid oversubscription.
+    Returns (labels before the update, new centroids, re-seeded clusters, inertia).
+    """
+    n_samples = X.shape[0]
+    if pool is None:
+        bounds = [(0, n_samples)]
+        parts = [shard_step(X, 0, n_samples, centroids, dtype, memory_budget, x_norms, backend)]
+    else:
+        bounds = shard_bounds(n_samples, n_shards or os.cpu_count() or 1)
+        parts = list(pool.map(lambda b: shard_step(X, b[0], b[1], centroids, dtype, memory_budget,
+                                                   x_norms, backend), bounds))
+    labels = np.empty(n_samples, dtype=np.intp)
+    sums = np.zeros((len(centroids), X.shape[1]))
+    counts = np.zeros(len(centroids), dtype=np.intp)
+    total = 0.0
+    for (start, stop), (lab, s, c, sq) in zip(bounds, parts):
+        labels[start:stop] = lab
+        sums += s
+        counts += c
+        total += sq
+    new, empty = means_from_sums(X, sums, counts, np.asarray(centroids, dtype=dtype), random_state)
+    return labels, new, empty, total
+
+def kmeans_threaded(X, centroids, max_iter=300, tol=1e-4, label_tol=0, n_threads=None, n_shards=None,
+                    random_state=None, dtype=np.float64, on_empty=None, backend="auto",
+                    memory_budget=MEMORY_BUDGET):
+    """
+    Lloyd's k-means with every iteration sharded over a thread pool (see lloyd_step);
+    n_threads=1 runs the same steps in the calling thread.
+    Stops once no centroid moves more than tol and at most label_tol labels changed;
+    tol=None always runs max_iter iterations. Returns a dict with centroids, labels,
+    n_iter, converged and inertia; labels and inertia are those of a final assignment
+    against the returned centroids.
+    """
+    X = np.asarray(X, dtype=dtype)
+    C = np.array(centroids, dtype=dtype)
+    x_norms = row_norms(X)
+    n_threads = n_threads or os.cpu_count() or 1
+    converged = False
+    labels, it = None, 0
+    pool = ThreadPoolExecutor(max_workers=n_threads) if n_threads > 1 else None
+    try:
+        for it in range(1, max_iter + 1):
+            prev = labels
+            labels, new_C, empty, _ = lloyd_step(X, C, dtype, memory_budget, x_norms, pool,
+                                                 n_shards or n_threads, random_state, backend)
+            if on_empty is not None:
+                for c in empty:
+                    on_empty(it, c)
+            shift = np.sqrt(row_norms(new_C - C)).max()
+            C = new_C
+            changed = len(labels) if prev is None else int(np.count_nonzero(labels != prev))
+            if tol is not None and shift <= tol and changed <= label_tol:
+                converged = True
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    # lloyd_step labels against the centroids it was given; re-assign against the updated ones
+    labels, min_sq = assign_labels(X, C, dtype, memory_budget, x_norms, backend)
+    return {"centroids": C, "labels": labels, "n_iter": it, "converged": converged,
+            "inertia": float(min_sq.sum())}
+
+# ---------------------------
+# Multiple restarts (n_init) over a process pool
+# ---------------------------
+class SharedMatrix:
+    """X copied once into a shared-memory block; workers map it instead of receiving a pickled copy."""
+    def __init__(self, X):
+        X = np.ascontiguousarray(X)
+        self.shape, self.dtype = X.shape, X.dtype.str
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes))
+        self.array = np.ndarray(X.shape, dtype=X.dtype, buffer=self.shm.buf)
+        self.array[:] = X
+
+    def worker_args(self):
+        return (self.shm.name, self.shape, self.dtype)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+_worker = {}
+
+def attach_shared_matrix(name, shape, dtype):
+    """Process-pool initializer: map the parent's shared block once per worker."""
+    shm = shared_memory.SharedMemory(name=name)
+    _worker.update(shm=shm, X=np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+
+def single_run(X, n_clusters, init, seed, max_iter, tol, dtype, label_tol=0, backend="auto",
+               accelerated=True, n_threads=1):
+    """
+    One seeded restart: init + k-means (Hamerly when accelerated, else threaded Lloyd
+    on n_threads threads), with timings for both phases.
+    Re-seeded empty clusters are recorded as "empty": [(iteration, cluster), ...].
+    """
+    rs = np.random.RandomState(seed)
+    empty = []
+    start = time.perf_counter()
+    centroids = init_centroids(X, n_clusters, init, rs, dtype)
+    seeded = time.perf_counter()
+    record = lambda it, c: empty.append((it, c))
+    if accelerated:
+        result = kmeans_hamerly(X, centroids, max_iter=max_iter, tol=tol, label_tol=label_tol, random_state=rs,
+                                dtype=dtype, on_empty=record, backend=backend)
+    else:
+        result = kmeans_threaded(X, centroids, max_iter=max_iter, tol=tol, label_tol=label_tol,
+                                 n_threads=n_threads, random_state=rs, dtype=dtype, on_empty=record,
+                                 backend=backend)
+    result.update(seed=seed, empty=empty, init_s=seeded - start, fit_s=time.perf_counter() - seeded)
+    return result
+
+def shared_run(n_clusters, init, seed, max_iter, tol, dtype, label_tol, backend, accelerated, n_threads):
+    """Worker task: single_run on the shared X."""
+    return single_run(_worker["X"], n_clusters, init, seed, max_iter, tol, dtype, label_tol, backend,
+                      accelerated, n_threads)
+
+def kmeans_restarts(X, n_clusters, n_init=10, init="k-means++", max_iter=300, tol=1e-4, seed=0,
+                    workers=None, dtype=np.float64, label_tol=0, backend="auto", on_empty=None,
+                    accelerated=True, n_threads=1):
+    """
+    n_init independent seeded runs (seeds seed, seed+1, ...); the best by inertia wins.
+    With workers > 1 the runs go to a process pool that maps X from shared memory.
+    label_tol, backend, accelerated and n_threads are passed to every run (see
+    single_run); on_empty is called for the empty clusters re-seeded in the winning run.
+    Returns the best run's result dict plus "runs": per-run seed, inertia, n_iter and timings.
+    """
+    X = np.asarray(X, dtype=dtype)
+    seeds = [seed + i for i in range(n_init)]
+    args = (max_iter, tol, dtype, label_tol, backend, accelerated, n_threads)
+    if workers is None or workers <= 1 or n_init <= 1:
+        results = [single_run(X, n_clusters, init, s, *args) for s in seeds]
+    else:
+        with SharedMatrix(X) as shared, ProcessPoolExecutor(
+                max_workers=min(workers, n_init), initializer=attach_shared_matrix,
+                initargs=shared.worker_args()) as pool:
+            futures = [pool.submit(shared_run, n_clusters, init, s, *args) for s in seeds]
+            results = [fut.result() for fut in futures]
+    best = min(results, key=lambda r: r["inertia"])
+    if on_empty is not None:
+        for it, c in best["empty"]:
+            on_empty(it, c)
+    best["runs"] = [{k: r[k] for k in ("seed", "inertia", "n_iter", "converged", "init_s", "fit_s")}
+                    for r in results]
+    return best
+
+# ---------------------------
+# Choosing k: warm-started sweep + sampled silhouette
+# ---------------------------
+def stratified_sample(labels, n_clusters, sample_size, random_state=None):
+    """Row indices drawn from every cluster in proportion to its size (at least 2 where possible)."""
+    rs = np.random if random_state is None else random_state
+    counts = np.bincount(labels, minlength=n_clusters)
+    if sample_size >= len(labels):
+        return np.arange(len(labels))
+    quota = np.minimum(counts, np.maximum(2, np.round(counts * sample_size / len(labels)).astype(int)))
+    order = np.argsort(labels, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    picks = [order[s + rs.choice(c, q, replace=False)] for s, c, q in zip(starts, counts, quota) if q]
+    return np.sort(np.concatenate(picks))
+
+def silhouette_score_sampled(X, labels, n_clusters, memory_budget=MEMORY_BUDGET):
+    """
+    Mean silhouette of the rows of X (a sample) among themselves. Pairwise distances
+    are built a block of rows at a time and summed per cluster with one matrix
+    product against the one-hot labels, so memory is one block, not s x s.
+    Clusters without sampled members are ignored (as if those labels were unused);
+    with fewer than two non-empty clusters the score is undefined and nan is returned.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    n = X.shape[0]
+    onehot = np.zeros((n, n_clusters))
+    onehot[np.arange(n), labels] = 1.0
+    counts = onehot.sum(axis=0)
+    if np.count_nonzero(counts) < 2:
+        return float("nan")
+    x_norms = row_norms(X)
+    s = np.zeros(n)
+    step = chunk_rows(n, n_clusters, 8, memory_budget)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        d = x_norms[start:stop, None] - 2.0 * (X[start:stop] @ X.T) + x_norms[None, :]
+        sums = np.sqrt(np.maximum(d, 0.0)) @ onehot       # block x k: distance sums per cluster
+        rows = np.arange(stop - start)
+        own = labels[start:stop]
+        own_size = counts[own] - 1
+        a = np.divide(sums[rows, own], own_size, out=np.zeros(stop - start), where=own_size > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_other = sums / counts
+        mean_other[:, counts == 0] = np.inf
+        mean_other[rows, own] = np.inf
+        b = mean_other.min(axis=1)
+        s[start:stop] = np.where(own_size > 0, (b - a) / np.maximum(a, b), 0.0)
+    return float(s.mean())
+
+def grow_centroids(X, centroids, min_sq, n_new, random_state=None, dtype=np.float64):
+    """Warm start for a larger k: keep the centroids, add n_new by D^2 sampling (k-means++ step)."""
+    rs = np.random if random_state is None else random_state
+    C = list(np.asarray(centroids, dtype=dtype))
+    closest = np.array(min_sq, dtype=np.float64)
+    for _ in range(n_new):
+        total = closest.sum()
+        i = rs.choice(len(X), p=closest / total) if total > 0 else rs.choice(len(X))
+        C.append(np.asarray(X[i], dtype=dtype))
+        np.minimum(closest, sq_distances_to(X, X[i], dtype), out=closest)
+    return np.array(C, dtype=dtype)
+
+def timed_silhouette(args):
+    """Worker task: (silhouette_score_sampled(*args), seconds)."""
+    start = time.perf_counter()
+    return silhouette_score_sampled(*args), time.perf_counter() - start
+
+def k_sweep(X, k_values, sample_size=2000, fit_size=100000, seed=0, max_iter=100, tol=1e-4,
+            workers=None, dtype=np.float64):
+    """
+    Score every k in k_values (ascending) for choosing the number of clusters.
+    - each k is fitted on a random subset of fit_size rows, warm-started from the
+      previous k's centroids plus D^2-sampled extra ones
+    - inertia is then measured over all of X with one chunked assignment pass
+    - silhouette is estimated on a stratified sample of sample_size rows; those run
+      in a process pool when workers > 1 (only the sampled rows are sent)
+    Returns one dict per k: k, inertia, n_iter, silhouette (None for k = 1 and when
+    fewer than two clusters are non-empty), timings.
+    """
+    X = np.asarray(X, dtype=dtype)
+    rs = np.random.RandomState(seed)
+    fit_X = X if X.shape[0] <= fit_size else X[np.sort(rs.choice(X.shape[0], fit_size, replace=False))]
+    report, jobs = [], []
+    C = None
+    for k in sorted(k_values):
+        start = time.perf_counter()
+        if C is None:
+            C = init_centroids(fit_X, k, "k-means++", rs, dtype)
+        elif k > len(C):
+            _, min_sq = assign_labels(fit_X, C, dtype)
+            C = grow_centroids(fit_X, C, min_sq, k - len(C), rs, dtype)
+        result = kmeans_hamerly(fit_X, C, max_iter=max_iter, tol=tol, random_state=rs, dtype=dtype)
+        C = result["centroids"]
+        labels, min_sq = assign_labels(X, C, dtype)
+        report.append({"k": k, "inertia": float(min_sq.sum()), "n_iter": result["n_iter"],
+                       "fit_s": time.perf_counter() - start, "silhouette": None, "silhouette_s": 0.0})
+        if k > 1:
+            sample = stratified_sample(labels, k, sample_size, rs)
+            jobs.append((len(report) - 1, (X[sample], labels[sample], k)))
+
+    if workers is not None and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            scores = list(pool.map(timed_silhouette, [args for _, args in jobs]))
+    else:
+        scores = [timed_silhouette(args) for _, args in jobs]
+    for (pos, _), (score, elapsed) in zip(jobs, scores):
+        report[pos].update(silhouette=None if np.isnan(score) else score, silhouette_s=elapsed)
+    return report
+
+# ---------------------------
+# Out-of-core mini-batch k-means
+# ---------------------------
+def csv_chunks(path, columns=None, chunk_rows=100000, dtype=np.float64):
+    """
+    Source of float chunks from a CSV: calling it returns a fresh generator, so the
+    file can be streamed once per epoch. columns=None keeps the numeric columns of
+    the first chunk. Only one chunk is ever in memory.
+    """
+    import pandas as pd
+    def generate():
+        usecols = columns
+        for frame in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows):
+            if usecols is None:
+                usecols = frame.select_dtypes(include=[np.number]).columns.tolist()
+            yield frame[usecols].to_numpy(dtype=dtype)
+    return generate
+
+def npy_chunks(path, columns=None, chunk_rows=100000, dtype=np.float64):
+    """Source of float chunks from a memory-mapped 2-D .npy file (see csv_chunks); columns are indices."""
+    def generate():
+        data = np.load(path, mmap_mode="r")
+        for start in range(0, data.shape[0], chunk_rows):
+            chunk = data[start:start + chunk_rows]
+            yield np.asarray(chunk if columns is None else chunk[:, columns], dtype=dtype)
+    return generate
+
+def batches(chunks, batch_size):
+    """Re-cut a stream of chunks into mini-batches of at most batch_size rows."""
+    for chunk in chunks:
+        for start in range(0, len(chunk), batch_size):
+            yield chunk[start:start + batch_size]
+
+def minibatch_kmeans(source, n_clusters, batch_size=4096, n_epochs=1, centroids=None,
+                     init="k-means++", random_state=None, dtype=np.float64):
+    """
+    Mini-batch k-means (Sculley 2010) over a chunk source (csv_chunks / npy_chunks).
+    Each centroid keeps the number of points it has absorbed, v; a batch moves it
+    towards the batch members' mean with per-cluster learning rate count / v, which
+    equals applying the per-sample 1/v updates in one step. Memory is O(k*d + batch).
+    Without centroids, the first batch is seeded with init_centroids(batch, init).
+    Returns (centroids, per-cluster counts, batches seen).
+    """
+    rs = np.random if random_state is None else random_state
+    C = None if centroids is None else np.array(centroids, dtype=dtype)
+    seen = None if C is None else np.zeros(len(C))
+    n_batches = 0
+    for _ in range(n_epochs):
+        for batch in batches(source(), batch_size):
+            if C is None:
+                C = init_centroids(batch, n_clusters, init, rs, dtype)
+                seen = np.zeros(n_clusters)
+            labels, _ = assign_labels(batch, C, dtype)
+            sums, counts = cluster_sums(batch, labels, len(C))
+            hit = counts > 0
+            seen += counts
+            C[hit] += (sums[hit] - counts[hit, None] * C[hit]) / seen[hit, None]
+            n_batches += 1
+    return C, seen, n_batches
+
+def write_labels(source, centroids, out_path, dtype=np.float64):
+    """Full labeling pass: stream the chunks again and append one label per row to out_path."""
+    n_rows = 0
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("cluster\n")
+        for chunk in source():
+            labels, _ = assign_labels(chunk, centroids, dtype)
+            f.write("\n".join(map(str, labels.tolist())))
+            f.write("\n")
+            n_rows += len(chunk)
+    return n_rows
+
+# ---------------------------
+# Named point sets (Practical9 / Practical10 style exercises)
+# ---------------------------
+METRICS = ("euclidean", "manhattan", "cosine")
+
+def named_points(points):
+    """{name: coordinates} -> (names, {name: row}, float array with one row per point)."""
+    names = list(points)
+    return names, {n: i for i, n in enumerate(names)}, np.array([points[n] for n in names], dtype=float)
+
+def metric_distance_chunks(X, centroids, metric="euclidean", memory_budget=MEMORY_BUDGET):
+    """Yield (start, stop, chunk x k distances) under one of METRICS, for any dimension."""
+    C = np.asarray(centroids, dtype=np.float64)
+    if metric == "euclidean":
+        for start, stop, sq in sq_distance_chunks(X, C, np.float64, memory_budget):
+            yield start, stop, np.sqrt(sq)
+        return
+    if metric == "cosine":
+        c_len = np.sqrt(row_norms(C))
+        C = C / np.where(c_len > 0, c_len, 1.0)[:, None]
+    elif metric != "manhattan":
+        raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}")
+    step = max(1, int(memory_budget // (len(C) * C.shape[1] * 8)))
+    for start in range(0, X.shape[0], step):
+        stop = min(start + step, X.shape[0])
+        Xc = np.asarray(X[start:stop], dtype=np.float64)
+        if metric == "manhattan":
+            yield start, stop, np.abs(Xc[:, None, :] - C[None, :, :]).sum(axis=2)
+        else:
+            x_len = np.sqrt(row_norms(Xc))
+            yield start, stop, 1.0 - (Xc / np.where(x_len > 0, x_len, 1.0)[:, None]) @ C.T
+
+def assign_step(X, centroids, metric="euclidean", return_distances=False, memory_budget=MEMORY_BUDGET):
+    """
+    One assignment step: nearest centroid per row, ties going to the lower index.
+    Euclidean labels come from assign_labels (exact tie handling). With
+    return_distances the full n x k distance matrix is returned as well.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    C = np.asarray(centroids, dtype=np.float64)
+    if metric == "euclidean":
+        labels = assign_labels(X, C, memory_budget=memory_budget)[0]
+        if not return_distances:
+            return labels
+    else:
+        labels = np.empty(X.shape[0], dtype=np.intp)
+    distances = np.empty((X.shape[0], len(C))) if return_distances else None
+    for start, stop, dist in metric_distance_chunks(X, C, metric, memory_budget):
+        if metric != "euclidean":
+            labels[start:stop] = np.argmin(dist, axis=1)
+        if return_distances:
+            distances[start:stop] = dist
+    return (labels, distances) if return_distances else labels
+
+def cluster_means(X, labels, n_clusters):
+    """Mean of each cluster's rows (NaN for an empty cluster) and the cluster sizes."""
+    sums, counts = cluster_sums(X, labels, n_clusters)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts[:, None], counts
+
+def cluster_members(names, labels, n_clusters):
+    """[names in cluster 0, names in cluster 1, ...], each in the original point order."""
+    order = np.argsort(labels, kind="stable")
+    bounds = np.cumsum(np.bincount(labels, minlength=n_clusters))
+    return [[names[i] for i in part] for part in np.split(order, bounds[:-1])]
+
+def kmeans_steps(X, centroids, metric="euclidean", max_iter=100):
+    """
+    Alternate assign_step / mean update until the labels stop changing (an empty
+    cluster keeps its previous centroid). Yields (iteration, labels, centroids) per step.
+    """
+    C = np.array(centroids, dtype=np.float64)
+    labels = None
+    for it in range(1, max_iter + 1):
+        new_labels = assign_step(X, C, metric)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        means, counts = cluster_means(X, labels, len(C))
+        C = np.where((counts > 0)[:, None], means, C)
+        yield it, labels, C
@@ -0,0 +1,66 @@
+# model_store.py
+# Persisted model artifacts shared by Practical4.py (ID3) and Practical5.py (sklearn tree).
+# An artifact is keyed by a SHA-256 of the input file's bytes plus the training
+# settings, so a re-run on unchanged data loads the fitted model instead of
+# re-parsing the CSV and refitting. Artifacts are single pickle files written
+# atomically under MODEL_DIR.
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+MODEL_DIR = ".model_cache"
+HASH_CHUNK = 1 << 20         # bytes read per hashing step
+
+def fingerprint(path, settings):
+    """Hex key for (file contents, settings). Settings must be JSON-serialisable (str fallback)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    h.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+def artifact_path(name, key, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"{name}-{key[:20]}.pkl")
+
+def save_artifact(name, key, artifact, model_dir=MODEL_DIR):
+    """Write the artifact (any picklable object) atomically; returns its path."""
+    os.makedirs(model_dir, exist_ok=True)
+    path = artifact_path(name, key, model_dir)
+    fd, tmp = tempfile.mkstemp(dir=model_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"key": key, "artifact": artifact}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+def load_artifact(name, key, model_dir=MODEL_DIR):
+    """The stored artifact for key, or None if missing / unreadable / for another key."""
+    path = artifact_path(name, key, model_dir)
+    try:
+        with open(path, "rb") as f:
+            stored = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if stored.get("key") != key:
+        return None
+    return stored["artifact"]
+
+def load_or_build(name, path, settings, build, model_dir=MODEL_DIR):
+    """
+    Return (artifact, from_cache). On a miss build() is called and its result saved.
+    Only load artifacts you created yourself: pickle runs code while loading.
+    """
+    key = fingerprint(path, settings)
+    artifact = load_artifact(name, key, model_dir)
+    if artifact is not None:
+        return artifact, True
+    artifact = build()
+    save_artifact(name, key, artifact, model_dir)
+    return artifact, False
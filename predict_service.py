@@ -0,0 +1,236 @@
+# predict_service.py
+# Resident prediction service for the Practical5 decision tree.
+# The model is loaded once (from the model store when the CSV is unchanged) and
+# served over local HTTP. Concurrent requests are grouped into micro-batches so
+# each batch costs one vectorized encode_test_frame() + one clf.predict call.
+#
+# Usage:
+#    python predict_service.py serve [--port 8765]
+#    python predict_service.py client [--requests 500 --concurrency 16]
+#
+# API (JSON):
+#    POST /predict  {"rows": [{"Age": "<21", "Income": "Low", ...}, ...]}
+#                -> {"predictions": [...]}
+#    GET  /stats    -> request/batch counts and latency percentiles (ms)
+
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import Practical5
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH_ROWS = 4096   # flush a micro-batch once it holds this many rows
+MAX_WAIT_MS = 5         # ... or once its oldest request has waited this long
+LATENCY_WINDOW = 10000  # recent requests kept for percentiles
+
+# ------------------ Micro-batching ------------------
+class MicroBatcher:
+    """
+    Collects submitted row lists on a queue; a single worker thread drains it into
+    micro-batches and scores each batch with one predict_frame() call.
+    """
+    def __init__(self, model, max_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.n_requests = 0
+        self.n_batches = 0
+        self.n_rows = 0
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, rows):
+        """Queue a list of raw row dicts; returns a Future with their predictions."""
+        if not isinstance(rows, list):
+            raise TypeError(f"rows must be a list of dicts, not {type(rows).__name__}")
+        fut = Future()
+        self.pending.put((rows, fut, time.perf_counter()))
+        return fut
+
+    def run(self):
+        while True:
+            batch = [self.pending.get()]
+            try:
+                self.collect(batch)
+                self.score(batch)
+            except Exception as e:
+                # never let one batch kill the only worker: fail its open requests instead
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    def collect(self, batch):
+        """Add queued requests to batch until it is full or its wait time is up."""
+        n_rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_rows:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self.pending.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+
+    def score(self, batch):
+        rows = [row for req_rows, _, _ in batch for row in req_rows]
+        try:
+            preds = Practical5.predict_frame(self.model, pd.DataFrame(rows)).tolist()
+        except Exception:
+            # one bad request must not fail the others: score them one by one
+            for item in batch:
+                self.score_one(item)
+        else:
+            start = 0
+            for req_rows, fut, _ in batch:
+                fut.set_result(preds[start:start + len(req_rows)])
+                start += len(req_rows)
+        done = time.perf_counter()
+        with self.lock:
+            self.n_batches += 1
+            self.n_requests += len(batch)
+            self.n_rows += len(rows)
+            self.latencies.extend(done - t0 for _, _, t0 in batch)
+
+    def score_one(self, item):
+        req_rows, fut, _ = item
+        try:
+            fut.set_result(Practical5.predict_frame(self.model, pd.DataFrame(req_rows)).tolist())
+        except Exception as e:
+            fut.set_exception(e)
+
+    def stats(self):
+        with self.lock:
+            lat = sorted(self.latencies)
+            out = {"requests": self.n_requests, "batches": self.n_batches, "rows": self.n_rows,
+                   "mean_batch_requests": self.n_requests / self.n_batches if self.n_batches else 0.0}
+        for q in (50, 90, 99):
+            out[f"p{q}_ms"] = lat[min(len(lat) - 1, int(len(lat) * q / 100))] * 1000.0 if lat else None
+        return out
+
+# ------------------ HTTP server ------------------
+class ServiceServer(ThreadingHTTPServer):
+    request_queue_size = 128   # the default backlog of 5 drops connections under bursts
+    daemon_threads = True
+
+def make_handler(batcher):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self.send_json(200, batcher.stats())
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self.send_json(404, {"error": "not found"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                rows = payload["rows"]
+                if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                    raise TypeError("rows must be a list of objects")
+            except (ValueError, KeyError, TypeError):
+                self.send_json(400, {"error": "expected JSON body {\"rows\": [{...}, ...]}"})
+                return
+            try:
+                self.send_json(200, {"predictions": batcher.submit(rows).result()})
+            except ValueError as e:
+                self.send_json(422, {"error": str(e)})
+            except Exception as e:
+                self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass   # keep the console quiet under load
+
+    return Handler
+
+def serve(host=HOST, port=PORT):
+    model, from_cache = Practical5.load_model(Practical5.CSV_FILE)
+    print("Model", "loaded from cache" if from_cache else "trained", "- features:", model["feature_cols"])
+    batcher = MicroBatcher(model)
+    server = ServiceServer((host, port), make_handler(batcher))
+    print(f"Serving predictions on http://{host}:{port} (POST /predict, GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Final stats:", batcher.stats())
+
+# ------------------ Client ------------------
+def predict_remote(rows, url=f"http://{HOST}:{PORT}"):
+    """Send raw rows to a running service; returns the list of predictions."""
+    req = urllib.request.Request(url + "/predict", data=json.dumps({"rows": rows}).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())["predictions"]
+
+def service_stats(url=f"http://{HOST}:{PORT}"):
+    with urllib.request.urlopen(url + "/stats") as resp:
+        return json.loads(resp.read())
+
+def run_client(url, n_requests, concurrency, rows_per_request):
+    """Fire n_requests concurrent requests with the assignment's test sample and report latency."""
+    sample = {"Age": "<21", "Income": "Low", "Gender": "Female", "Ms": "Married"}
+    rows = [sample] * rows_per_request
+    latencies = []
+    def one(_):
+        t0 = time.perf_counter()
+        preds = predict_remote(rows, url)
+        latencies.append(time.perf_counter() - t0)
+        return preds
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(n_requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print("First prediction:", results[0][0])
+    print(f"{n_requests} requests in {elapsed:.3f}s ({n_requests / elapsed:.0f} req/s)")
+    for q in (50, 90, 99):
+        print(f"  client p{q} = {latencies[min(len(latencies) - 1, int(len(latencies) * q / 100))] * 1000:.2f} ms")
+    print("Server stats:", service_stats(url))
+
+def main():
+    parser = argparse.ArgumentParser(description="Practical5 prediction service")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve")
+    s.add_argument("--host", default=HOST)
+    s.add_argument("--port", type=int, default=PORT)
+    c = sub.add_parser("client")
+    c.add_argument("--url", default=f"http://{HOST}:{PORT}")
+    c.add_argument("--requests", type=int, default=500)
+    c.add_argument("--concurrency", type=int, default=16)
+    c.add_argument("--rows", type=int, default=1, help="rows per request")
+    args = parser.parse_args()
+    if args.cmd == "serve":
+        serve(args.host, args.port)
+    else:
+        run_client(args.url, args.requests, args.concurrency, args.rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+# summary_stats.py
+# Descriptive statistics for the Practical2 / Practical3 summaries in one pass per column.
+#
+# pandas computes min, max, mean, std, var and every quantile with a separate scan
+# of the frame, and each quantile() call partitions the data again. Here each
+# column is read once in cache-sized chunks that update count, min, max, sum and
+# the sum of squared deviations (Chan et al.'s parallel form of Welford's update),
+# and all requested percentiles come from a single np.partition of that column.
+# Results are returned as pandas Series shaped like the ones df.min(), df.std(),
+# df.quantile(q), ... return, so printing them gives the same report.
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 65536   # rows per update: large enough for NumPy, small enough to stay in cache
+
+def lerp(a, b, t):
+    """NumPy's linear interpolation for quantiles (same rounding as np.percentile)."""
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+def partition_percentiles(values, percentiles):
+    """Linear-interpolated percentiles (fractions in [0, 1]) of NaN-free values with one partition."""
+    n = len(values)
+    if n == 0 or not len(percentiles):
+        return {q: np.nan for q in percentiles}
+    pos = np.asarray(percentiles, dtype=np.float64) * (n - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    part = np.partition(values, np.unique(np.concatenate([lo, hi])))
+    out = lerp(part[lo], part[hi], pos - lo)
+    return {q: float(v) for q, v in zip(percentiles, out)}
+
+class Moments:
+    """count, sum, min, max, mean and sum of squared deviations of a numeric stream; mergeable."""
+    def __init__(self):
+        self.count, self.total, self.mean, self.m2 = 0, 0.0, 0.0, 0.0
+        self.lo = self.hi = None
+
+    def update(self, chunk):
+        """Fold in a NaN-free chunk (two cheap passes over data that is still in cache)."""
+        n = len(chunk)
+        if n == 0:
+            return
+        other = Moments()
+        other.lo, other.hi = chunk.min(), chunk.max()
+        x = chunk.astype(np.float64, copy=False)
+        other.count, other.total = n, x.sum()
+        other.mean = other.total / n
+        other.m2 = float(np.square(x - other.mean).sum())
+        self.merge(other)
+
+    def merge(self, other):
+        """Chan et al.: combine two partial states as if their data had been seen together."""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.total += other.total
+        self.count = count
+        self.lo = other.lo if self.lo is None else min(self.lo, other.lo)
+        self.hi = other.hi if self.hi is None else max(self.hi, other.hi)
+
+    def stats(self, ddof=1):
+        var = self.m2 / (self.count - ddof) if self.count > ddof else np.nan
+        return {"count": self.count, "min": np.nan if self.lo is None else self.lo,
+                "max": np.nan if self.hi is None else self.hi,
+                "mean": self.total / self.count if self.count else np.nan, "var": var, "std": np.sqrt(var)}
+
+def column_stats(values, percentiles=(), ddof=1, chunk_rows=CHUNK_ROWS):
+    """
+    count, min, max, mean, var, std and the requested percentiles of one numeric
+    column (NaNs skipped). min / max keep the column's scalar type.
+    """
+    values = np.asarray(values)
+    is_float = values.dtype.kind == "f"
+    moments = Moments()
+    for start in range(0, len(values), chunk_rows):
+        chunk = values[start:start + chunk_rows]
+        moments.update(chunk[~np.isnan(chunk)] if is_float else chunk)
+    stats = moments.stats(ddof)
+    if len(percentiles):
+        x = values.astype(np.float64)   # a copy: np.partition reorders it
+        stats["percentiles"] = partition_percentiles(x[~np.isnan(x)] if is_float else x, percentiles)
+    return stats
+
+def reduction_series(values, columns, dtypes):
+    """Series like a DataFrame reduction over mixed columns: common numeric dtype, else object."""
+    if all(pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t) for t in dtypes):
+        return pd.Series(values, index=columns, dtype=np.result_type(*dtypes) if len(dtypes) else np.float64)
+    return pd.Series(values, index=columns, dtype=object)
+
+def summarize(df, percentiles=(0.25, 0.50, 0.75), ddof=1):
+    """
+    One pass per column over df. Returns {stat: Series} with
+    - "min", "max": every column (like df.min() / df.max())
+    - "count", "mean", "var", "std": numeric and boolean columns (numeric_only=True)
+    - each q in percentiles: numeric columns, named q (like df.quantile(q))
+    """
+    numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c].dtype)]
+    number = set(df.select_dtypes(include="number").columns)
+    per_column = {c: column_stats(df[c].to_numpy(), percentiles if c in number else (), ddof)
+                  for c in numeric}
+
+    mins, maxs = [], []
+    for c in df.columns:
+        if c in per_column and not pd.api.types.is_bool_dtype(df[c].dtype):
+            mins.append(per_column[c]["min"])
+            maxs.append(per_column[c]["max"])
+        else:
+            mins.append(df[c].min())
+            maxs.append(df[c].max())
+    dtypes = list(df.dtypes)
+    out = {"min": reduction_series(mins, df.columns, dtypes),
+           "max": reduction_series(maxs, df.columns, dtypes)}
+    for stat in ("count", "mean", "var", "std"):
+        out[stat] = pd.Series([per_column[c][stat] for c in numeric], index=df.columns[df.columns.isin(numeric)],
+                              dtype=np.int64 if stat == "count" else np.float64)
+    quantile_cols = df.columns[df.columns.isin(number)]
+    for q in percentiles:
+        out[q] = pd.Series([per_column[c]["percentiles"][q] for c in quantile_cols],
+                           index=quantile_cols, dtype=np.float64, name=q)
+    return out
+
+# ---------------------------
+# Streaming, mergeable summaries (chunked CSVs, many files, worker processes)
+# ---------------------------
+RANK_ERROR = 0.005   # target rank error of the streaming percentiles (0.5% of the rows)
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty 2016). Items live in levels; an item
+    at level h stands for 2^h inputs. A level over its capacity is sorted and every
+    other item (random offset) is promoted, so memory stays O(k log(n / k)) and the
+    rank error is about 1.7 / k of n. Sketches with the same k merge level by level.
+    """
+    def __init__(self, k=None, rank_error=RANK_ERROR, seed=None):
+        self.k = k if k is not None else max(8, int(np.ceil(1.7 / rank_error)))
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, h):
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** (len(self.levels) - h - 1))))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge KLL sketches with k={self.k} and k={other.k}")
+        self.n += other.n
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.compress()
+
+    def compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) <= self.capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            level = np.sort(level)
+            odd = len(level) % 2
+            self.levels[h] = level[:odd]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], level[odd + self.rng.integers(2)::2]])
+            h = 0   # capacities depend on the number of levels
+
+    def quantiles(self, percentiles):
+        """Approximate percentiles (fractions in [0, 1]); exact while nothing was compacted."""
+        if len(self.levels) == 1:
+            return partition_percentiles(self.levels[0].copy(), percentiles)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(percentiles, dtype=np.float64) * (cum[-1] - 1)
+        pos = np.minimum(np.searchsorted(cum, ranks, side="right"), len(items) - 1)
+        return {q: float(items[i]) for q, i in zip(percentiles, pos)}
+
+class StreamSummary:
+    """
+    Mergeable summary of a table seen in chunks: exact count / min / max / mean / var
+    (Moments) and a KLL sketch per numeric column, plus min / max for other columns.
+    Memory does not grow with the number of rows; states from different files or
+    processes combine with merge() (they pickle).
+    """
+    def __init__(self, rank_error=RANK_ERROR, seed=None):
+        self.rank_error, self.seed = rank_error, seed
+        self.columns, self.dtypes = [], {}
+        self.moments, self.sketches, self.extremes = {}, {}, {}
+        self.head = None
+        self.n_rows = 0
+
+    def add_column(self, col, dtype):
+        self.columns.append(col)
+        self.dtypes[col] = dtype
+        if pd.api.types.is_numeric_dtype(dtype):
+            self.moments[col] = Moments()
+            if not pd.api.types.is_bool_dtype(dtype):
+                self.sketches[col] = KLLSketch(rank_error=self.rank_error, seed=self.seed)
+        else:
+            self.extremes[col] = [None, None]
+
+    def demote(self, col, dtype):
+        """
+        Track a numeric column as non-numeric from now on (min / max only). Only allowed
+        while no value has been folded in - e.g. its first chunks were all empty, which
+        pandas reads as float64 - otherwise the column really changed type mid-stream.
+        """
+        if self.moments[col].count:
+            raise ValueError(f"Column '{col}' changed from numeric to {dtype} mid-stream")
+        del self.moments[col]
+        self.sketches.pop(col, None)
+        self.extremes[col] = [None, None]
+        self.dtypes[col] = dtype
+
+    def update(self, df):
+        if self.head is None:
+            self.head = df.head()
+        self.n_rows += len(df)
+        for col in df.columns:
+            if col not in self.dtypes:
+                self.add_column(col, df[col].dtype)
+            values = df[col]
+            if col in self.moments and not pd.api.types.is_numeric_dtype(values.dtype):
+                self.demote(col, values.dtype)
+            if col in self.moments:
+                self.dtypes[col] = np.result_type(self.dtypes[col], values.dtype)
+                x = values.to_numpy()
+                if x.dtype.kind == "f":
+                    x = x[~np.isnan(x)]
+                self.moments[col].update(x)
+                if col in self.sketches:
+                    self.sketches[col].update(x)
+            else:
+                values = values.dropna()   # text columns with empty cells: min/max of the rest
+                if len(values):
+                    self.merge_extremes(col, values.min(), values.max())
+
+    def merge_extremes(self, col, lo, hi):
+        cur = self.extremes[col]
+        if not pd.isna(lo):
+            cur[0] = lo if cur[0] is None else min(cur[0], lo)
+        if not pd.isna(hi):
+            cur[1] = hi if cur[1] is None else max(cur[1], hi)
+
+    def merge(self, other):
+        """Fold another state into this one (columns are matched by name)."""
+        if self.head is None:
+            self.head = other.head
+        self.n_rows += other.n_rows
+        for col in other.columns:
+            if col not in self.dtypes:
+                self.add_column(col, other.dtypes[col])
+            if col in self.moments and col in other.extremes:
+                self.demote(col, other.dtypes[col])
+            if col in self.extremes and col in other.moments:
+                if other.moments[col].count:
+                    raise ValueError(f"Column '{col}' is numeric in one state and {self.dtypes[col]} in the other")
+                continue   # nothing but missing values on the other side
+            if col in self.moments:
+                self.dtypes[col] = np.result_type(self.dtypes[col], other.dtypes[col])
+                self.moments[col].merge(other.moments[col])
+                if col in self.sketches:
+                    self.sketches[col].merge(other.sketches[col])
+            else:
+                self.merge_extremes(col, *other.extremes[col])
+        return self
+
+    def result(self, percentiles=(0.25, 0.50, 0.75), ddof=1):
+        """{stat: Series} in the same layout as summarize(); percentiles are sketch estimates."""
+        columns = pd.Index(self.columns)
+        stats = {c: m.stats(ddof) for c, m in self.moments.items()}
+        mins = [stats[c]["min"] if c in stats else self.extremes[c][0] for c in self.columns]
+        maxs = [stats[c]["max"] if c in stats else self.extremes[c][1] for c in self.columns]
+        dtypes = [self.dtypes[c] for c in self.columns]
+        out = {"min": reduction_series(mins, columns, dtypes), "max": reduction_series(maxs, columns, dtypes)}
+        numeric = columns[columns.isin(list(self.moments))]
+        for stat in ("count", "mean", "var", "std"):
+            out[stat] = pd.Series([stats[c][stat] for c in numeric], index=numeric,
+                                  dtype=np.int64 if stat == "count" else np.float64)
+        sketched = columns[columns.isin(list(self.sketches))]
+        estimates = {c: self.sketches[c].quantiles(percentiles) for c in sketched}
+        for q in percentiles:
+            out[q] = pd.Series([estimates[c][q] for c in sketched], index=sketched, dtype=np.float64, name=q)
+        return out
+
+def summarize_csv(path, chunk_rows=1_000_000, rank_error=RANK_ERROR, seed=0):
+    """StreamSummary of a CSV read chunk_rows rows at a time."""
+    state = StreamSummary(rank_error, seed)
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        state.update(chunk)
+    return state
+
+def summarize_files(paths, workers=None, chunk_rows=1_000_000, rank_error=RANK_ERROR, seed=0):
+    """One StreamSummary per file (in a process pool when workers > 1), merged into one."""
+    from concurrent.futures import ProcessPoolExecutor
+    jobs = [(p, chunk_rows, rank_error, seed + i) for i, p in enumerate(paths)]
+    if workers is not None and workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            states = list(pool.map(summarize_csv, *zip(*jobs)))
+    else:
+        states = [summarize_csv(*job) for job in jobs]
+    total = states[0]
+    for state in states[1:]:
+        total.merge(state)
+    return total
+
+def main(argv=None):
+    import argparse
+    import pickle
+    parser = argparse.ArgumentParser(description="Streaming summary statistics for large CSV exports")
+    parser.add_argument("files", nargs="*", help="CSV files to summarize (merged into one summary)")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (one file per task)")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--rank-error", type=float, default=RANK_ERROR)
+    parser.add_argument("--merge", nargs="*", default=[], help="saved states to merge in")
+    parser.add_argument("--save-state", help="write the merged state here (pickle) for later merging")
+    args = parser.parse_args(argv)
+    if not args.files and not args.merge:
+        parser.error("give CSV files and/or --merge states")
+
+    states = [summarize_files(args.files, args.workers, args.chunk_rows, args.rank_error)] if args.files else []
+    for path in args.merge:
+        with open(path, "rb") as f:
+            states.append(pickle.load(f))
+    state = states[0]
+    for other in states[1:]:
+        state.merge(other)
+    if args.save_state:
+        with open(args.save_state, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    stats = state.result()
+    print(f"{state.n_rows} rows")
+    for title, key in (("Minimum", "min"), ("Maximum", "max"), ("Mean", "mean"), ("Std deviation", "std"),
+                       ("Variance", "var"), (f"25th Percentile (±{args.rank_error:.1%} rank)", 0.25),
+                       ("50th Percentile (Median)", 0.50), ("75th Percentile", 0.75)):
+        print(f"\n=== {title} ===")
+        print(stats[key])
+
+if __name__ == "__main__":
+    main()